@@ -8,13 +8,53 @@ from app.routes.predict import predict_bp
 from app.routes.service_requests import service_requests_bp
 
 from app.routes.dashboard import dashboard_bp
+from app.routes.health import health_bp
+from app.routes.metrics import metrics_bp
+from app.services.predictors.warmup import MODEL_WARMUP, MODEL_WARMUP_ON_STARTUP, start_warmup
+from app.services.predictors.hot_swap import start_watcher
+from app.memory_budget import DEGRADED_HEADER
+from app.profiling import init_profiling
+from app.timing import init_request_timing
 
 
 load_dotenv()
-app = Flask(__name__)
-CORS(app)
 
-app.register_blueprint(auth_bp)
-app.register_blueprint(predict_bp)
-app.register_blueprint(service_requests_bp)
-app.register_blueprint(dashboard_bp)
+
+# Builds the Flask app. preload_models loads every model in the calling thread before returning (a pre-forking
+# server calls this in its master, so it only deserializes: the warm-up prediction runs in each worker);
+# start_background starts this process's warm-up and model watcher threads.
+def create_app(preload_models: bool = False, start_background: bool = True) -> Flask:
+    app = Flask(__name__)
+    # Browsers only hand custom headers to the client when they are exposed: the dashboard's truncation notice
+    # and the 503 retry delay
+    CORS(app, expose_headers=[DEGRADED_HEADER, "Retry-After"])
+    # Profiling first: its after_request then runs last, so writing a profile is not counted as request time
+    init_profiling(app)
+    init_request_timing(app)
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(predict_bp)
+    app.register_blueprint(service_requests_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
+
+    # Indexes (app/indexes.py) are created by the ensure_indexes.py deploy step, not here: an unreachable
+    # MongoDB would otherwise block every worker's boot until server selection times out
+
+    if preload_models:
+        MODEL_WARMUP.load_now()
+    if start_background:
+        start_background_tasks()
+    return app
+
+
+# Starts the background threads of this process. Threads do not survive a fork, so under a pre-forking server
+# this runs in each worker after it is forked (see gunicorn.conf.py).
+def start_background_tasks():
+    # Models load in a background thread so starting the app stays fast; /healthz/ready reports when they are warm
+    if MODEL_WARMUP_ON_STARTUP:
+        start_warmup()
+
+    # New model versions (registry CURRENT or retrained pickles) are validated and swapped in without a restart
+    start_watcher()
@@ -1,13 +1,185 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from dotenv import load_dotenv
 import os
+import threading
+
+from app.timing import record_span
 
 load_dotenv()
 mongo_uri = os.getenv("MONGO_URI")
+# The one database every collection of the app lives in
+DATABASE_NAME = os.getenv("DATABASE_NAME") or "DS_PROJECT"
+
+
+# Reads an integer setting from the environment, falling back to the default when unset or invalid
+def _env_int(name: str, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid value for {name}: {value!r}")
+        return default
+
+
+POOL_OPTIONS = {
+    "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 50),
+    "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+    "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 300000),
+    "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000),
+    "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+    "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+    "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS", 30000),
+}
+
+
+# Collects connection pool counters from pymongo's CMAP events so the pool can be sized
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkins = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pools_cleared = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checked_out": self.checkouts - self.checkins,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "open_connections": self.connections_created - self.connections_closed,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "pools_cleared": self.pools_cleared,
+            }
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            # Every connection in the pool is busy, so this checkout has to queue
+            if self.checkouts - self.checkins >= POOL_OPTIONS["maxPoolSize"]:
+                self.waits += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += getattr(event, "duration", 0.0) or 0.0
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+POOL_STATS = PoolStatsListener()
+
+
+# Times every Mongo command as a span of the request that issued it (mongo_find, mongo_insert, mongo_getMore, ...)
+class CommandTimingListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_span(f"mongo_{event.command_name}", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        record_span(f"mongo_{event.command_name}", event.duration_micros / 1e6)
+
+
+COMMAND_TIMING = CommandTimingListener()
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+# Returns the process-wide MongoClient, creating it lazily on first use (and again after a fork)
+def get_client() -> MongoClient:
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = MongoClient(mongo_uri, event_listeners=[POOL_STATS, COMMAND_TIMING], **POOL_OPTIONS)
+            _client_pid = pid
+    return _client
+
+
+# Drops the inherited client in a forked child; sockets and monitor threads must not be shared across processes
+def _reset_client_after_fork():
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    POOL_STATS.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
+
+
+# Closes the shared client, e.g. on worker shutdown
+def close_client():
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+# Returns the pool configuration and live counters for the shared client
+def get_pool_stats() -> dict:
+    return {
+        "pid": os.getpid(),
+        "client_initialized": _client is not None and _client_pid == os.getpid(),
+        "options": dict(POOL_OPTIONS),
+        "stats": POOL_STATS.snapshot(),
+    }
+
 
 def get_collection(database_name: str, collection_name: str):
     try:
-        client = MongoClient(mongo_uri)
+        client = get_client()
         db = client[database_name]
         return db[collection_name]
     except Exception as e:
@@ -17,7 +189,7 @@ def get_collection(database_name: str, collection_name: str):
 def update_user_schema():
     """Update user collection schema to include new fields"""
     try:
-        users_collection = get_collection("DS_PROJECT", "users")
+        users_collection = get_collection(DATABASE_NAME, "users")
         if users_collection is None:
             print("Could not connect to users collection")
             return False
@@ -58,7 +230,7 @@ def update_user_schema():
 def get_user_by_emp_id(emp_id):
     """Get user by employee ID"""
     try:
-        users_collection = get_collection("DS_PROJECT", "users")
+        users_collection = get_collection(DATABASE_NAME, "users")
         if users_collection is None:
             return None
         
@@ -71,7 +243,7 @@ def get_user_by_emp_id(emp_id):
 def update_user_account_info(emp_id, account_data):
     """Update user account information"""
     try:
-        users_collection = get_collection("DS_PROJECT", "users")
+        users_collection = get_collection(DATABASE_NAME, "users")
         if users_collection is None:
             return False
         
@@ -98,7 +270,7 @@ def update_user_account_info(emp_id, account_data):
 def update_user_dashboard_preferences(emp_id, dashboard_data):
     """Update user dashboard preferences"""
     try:
-        users_collection = get_collection("DS_PROJECT", "users")
+        users_collection = get_collection(DATABASE_NAME, "users")
         if users_collection is None:
             return False
         
@@ -125,7 +297,7 @@ def update_user_dashboard_preferences(emp_id, dashboard_data):
 def update_user_privacy_settings(emp_id, privacy_data):
     """Update user privacy settings"""
     try:
-        users_collection = get_collection("DS_PROJECT", "users")
+        users_collection = get_collection(DATABASE_NAME, "users")
         if users_collection is None:
             return False
         
@@ -0,0 +1,97 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure, PyMongoError
+from dotenv import load_dotenv
+from datetime import datetime
+import os
+
+from app.db import DATABASE_NAME, get_collection
+
+load_dotenv()
+
+# Declarative list of the indexes every collection is expected to have, keyed by (database, collection)
+INDEX_REGISTRY = {
+    (DATABASE_NAME, "users"): [
+        IndexModel([("emp_id", ASCENDING)], name="emp_id_unique", unique=True),
+    ],
+    (DATABASE_NAME, "newRequests"): [
+        IndexModel(
+            [("Request status", ASCENDING), ("Site", ASCENDING), ("Created on", DESCENDING)],
+            name="status_site_created_on",
+        ),
+        IndexModel([("Site", ASCENDING), ("Created on", DESCENDING)], name="site_created_on"),
+    ],
+    (DATABASE_NAME, "service_requests"): [
+        IndexModel([("Site", ASCENDING), ("Created on", DESCENDING)], name="site_created_on"),
+        IndexModel([("Created on", DESCENDING)], name="created_on"),
+    ],
+    (DATABASE_NAME, "daily_rollups"): [
+        IndexModel([("_id.source", ASCENDING), ("_id.site", ASCENDING), ("_id.date", ASCENDING)], name="source_site_date"),
+    ],
+}
+
+# Queries issued on hot paths that must be served from an index: (database, collection, filter, sort)
+HOT_QUERIES = [
+    (DATABASE_NAME, "users", {"emp_id": "__probe__", "password": "__probe__"}, None),
+    (DATABASE_NAME, "users", {"emp_id": "__probe__"}, None),
+    (DATABASE_NAME, "newRequests", {"Request status": "Open"}, None),
+    (DATABASE_NAME, "newRequests", {"Site": "A"}, [("Created on", DESCENDING)]),
+    (DATABASE_NAME, "service_requests", {"Site": "A"}, [("Created on", DESCENDING)]),
+    (DATABASE_NAME, "service_requests", {"Created on": {"$gte": datetime(2024, 1, 1)}}, None),
+]
+
+
+# Creates every registered index; create_indexes is a no-op for indexes that already exist with the same spec
+def ensure_indexes() -> dict:
+    summary = {}
+    for (database_name, collection_name), models in INDEX_REGISTRY.items():
+        key = f"{database_name}.{collection_name}"
+        collection = get_collection(database_name, collection_name)
+        if collection is None:
+            summary[key] = {"error": "DB connection failed"}
+            continue
+        try:
+            summary[key] = {"indexes": collection.create_indexes(models)}
+        except ConnectionFailure as e:
+            # The server is unreachable; don't wait out the same timeout for every collection
+            summary[key] = {"error": str(e)}
+            break
+        except PyMongoError as e:
+            summary[key] = {"error": str(e)}
+    return summary
+
+
+# Walks an explain() plan tree and yields the name of every stage in it
+def _plan_stages(plan: dict):
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+# Runs explain() on each hot query and reports the winning plan's stages; ok is False if any query uses a COLLSCAN
+def check_hot_queries() -> dict:
+    results = []
+    for database_name, collection_name, query, sort in HOT_QUERIES:
+        entry = {"collection": f"{database_name}.{collection_name}", "filter": query}
+        collection = get_collection(database_name, collection_name)
+        if collection is None:
+            entry.update({"ok": False, "error": "DB connection failed"})
+            results.append(entry)
+            continue
+        try:
+            cursor = collection.find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+            stages = list(_plan_stages(plan))
+            entry.update({"ok": "COLLSCAN" not in stages, "stages": stages})
+        except Exception as e:
+            entry.update({"ok": False, "error": str(e)})
+        results.append(entry)
+
+    return {"ok": all(r["ok"] for r in results), "queries": results}
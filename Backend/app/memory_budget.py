@@ -0,0 +1,234 @@
+import os
+import random
+import threading
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from flask import Response, jsonify
+from prometheus_client import Counter, Gauge, Histogram
+
+load_dotenv()
+# Bytes one worker may hold at once for whole-collection dashboard loads; "0" disables the budget
+DASHBOARD_MEMORY_BUDGET_MB = float(os.getenv("DASHBOARD_MEMORY_BUDGET_MB", "512"))
+# What to do with a load over budget: "degrade" retries it limited to the last DASHBOARD_DEGRADED_DAYS days
+# (503 if that is still over budget), "reject" answers 503 right away
+DASHBOARD_OVER_BUDGET = os.getenv("DASHBOARD_OVER_BUDGET", "degrade")
+DASHBOARD_DEGRADED_DAYS = int(os.getenv("DASHBOARD_DEGRADED_DAYS", "90"))
+DASHBOARD_RETRY_AFTER_SECONDS = int(os.getenv("DASHBOARD_RETRY_AFTER_SECONDS", "30"))
+# Estimated peak bytes per loaded document until a load of this endpoint has been measured
+DASHBOARD_BYTES_PER_DOC = int(os.getenv("DASHBOARD_BYTES_PER_DOC", "4096"))
+# Loads smaller than this are measured but do not update the bytes-per-document estimate (fixed costs dominate)
+DASHBOARD_LEARN_MIN_DOCS = int(os.getenv("DASHBOARD_LEARN_MIN_DOCS", "1000"))
+# Fraction of dashboard loads whose peak is measured with tracemalloc, which slows allocations while it runs;
+# the first load of each endpoint always is. "0" leaves the budget on DASHBOARD_BYTES_PER_DOC and reports RSS only.
+DASHBOARD_TRACEMALLOC_RATE = float(os.getenv("DASHBOARD_TRACEMALLOC_RATE", "0.1"))
+
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 4, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096))
+
+LOAD_PEAK_BYTES = Histogram(
+    "dashboard_load_peak_bytes", "Peak memory allocated while building a whole-collection dashboard response",
+    ["endpoint"], buckets=MEMORY_BUCKETS,
+)
+LOAD_RSS_BYTES = Gauge(
+    "dashboard_load_rss_bytes", "Resident set size of the worker after its last dashboard load",
+    ["endpoint"], multiprocess_mode="livemax",
+)
+BUDGET_OUTCOMES = Counter(
+    "dashboard_memory_budget_total", "Dashboard loads by memory budget outcome (full, degraded, rejected)",
+    ["endpoint", "outcome"],
+)
+
+
+# Current resident set size of this process in bytes; None where /proc is unavailable (e.g. Windows)
+def rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+_TRACE_LOCK = threading.Lock()
+_TRACE_ACTIVE = 0
+_TRACE_OWNED = False
+
+
+# Measures the peak memory of the enclosed block with tracemalloc (sampled unless trace is given) and observes it
+# for an endpoint, along with the worker's RSS afterwards. tracemalloc is global to the process: it only runs
+# while at least one block is traced, and traced blocks that overlap in time each see the other's allocations,
+# which overestimates (never underestimates) their peaks.
+class track_memory:
+    def __init__(self, endpoint: str, trace: Optional[bool] = None):
+        self.endpoint = endpoint
+        self.trace = random.random() < DASHBOARD_TRACEMALLOC_RATE if trace is None else trace
+        self.peak: Optional[int] = None
+        self.rss_after: Optional[int] = None
+
+    def __enter__(self):
+        global _TRACE_ACTIVE, _TRACE_OWNED
+        if self.trace:
+            with _TRACE_LOCK:
+                if _TRACE_ACTIVE == 0:
+                    if tracemalloc.is_tracing():
+                        tracemalloc.reset_peak()
+                    else:
+                        tracemalloc.start()
+                        _TRACE_OWNED = True
+                _TRACE_ACTIVE += 1
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _TRACE_ACTIVE, _TRACE_OWNED
+        if self.trace:
+            self.peak = max(0, tracemalloc.get_traced_memory()[1] - self.baseline)
+            with _TRACE_LOCK:
+                _TRACE_ACTIVE -= 1
+                if _TRACE_ACTIVE == 0 and _TRACE_OWNED:
+                    tracemalloc.stop()
+                    _TRACE_OWNED = False
+        self.rss_after = rss_bytes()
+        if self.peak is not None:
+            LOAD_PEAK_BYTES.labels(self.endpoint).observe(self.peak)
+        if self.rss_after is not None:
+            LOAD_RSS_BYTES.labels(self.endpoint).set(self.rss_after)
+        return False
+
+
+# Memory reserved for one admitted load; since is the cutoff of a degraded load, None for the full collection
+class LoadPlan:
+    __slots__ = ("endpoint", "since", "documents", "reserved")
+
+    def __init__(self, endpoint: str, since: Optional[datetime], documents: int, reserved: int):
+        self.endpoint = endpoint
+        self.since = since
+        self.documents = documents
+        self.reserved = reserved
+
+
+# Admits whole-collection loads against a per-worker memory budget, estimating each from its document count
+# and the peak bytes per document measured on earlier loads of the same endpoint
+class DashboardMemoryBudget:
+    def __init__(self, budget_mb: float = DASHBOARD_MEMORY_BUDGET_MB, mode: str = DASHBOARD_OVER_BUDGET,
+                 degraded_days: int = DASHBOARD_DEGRADED_DAYS):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.mode = mode
+        self.degraded_days = degraded_days
+        self._lock = threading.Lock()
+        self.in_flight_bytes = 0
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def _stats(self, endpoint: str) -> Dict[str, Any]:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = {
+                "bytes_per_doc": DASHBOARD_BYTES_PER_DOC, "measured": False,
+                "loads": 0, "degraded": 0, "rejected": 0,
+                "last_documents": None, "last_peak_bytes": None, "max_peak_bytes": 0,
+            }
+        return stats
+
+    # Reserves the estimated bytes of a load if they fit next to the loads already running
+    def _reserve(self, endpoint: str, since: Optional[datetime], documents: int) -> Optional[LoadPlan]:
+        estimate = documents * self._stats(endpoint)["bytes_per_doc"]
+        with self._lock:
+            if self.in_flight_bytes + estimate > self.budget_bytes:
+                return None
+            self.in_flight_bytes += estimate
+        return LoadPlan(endpoint, since, documents, estimate)
+
+    # Plans a load: the full collection if it fits, else the recent window (degrade mode), else None (503).
+    # count(since) returns the number of documents the load would read, since=None meaning all of them.
+    def admit(self, endpoint: str, count: Callable[[Optional[datetime]], int]) -> Optional[LoadPlan]:
+        stats = self._stats(endpoint)
+        if self.budget_bytes <= 0:
+            return LoadPlan(endpoint, None, 0, 0)
+        plan = self._reserve(endpoint, None, count(None))
+        if plan is not None:
+            BUDGET_OUTCOMES.labels(endpoint, "full").inc()
+            return plan
+        if self.mode == "degrade":
+            since = datetime.now() - timedelta(days=self.degraded_days)
+            plan = self._reserve(endpoint, since, count(since))
+            if plan is not None:
+                stats["degraded"] += 1
+                BUDGET_OUTCOMES.labels(endpoint, "degraded").inc()
+                return plan
+        stats["rejected"] += 1
+        BUDGET_OUTCOMES.labels(endpoint, "rejected").inc()
+        return None
+
+    # Whether the next load of an endpoint should be traced: always until one has been measured, then sampled
+    def should_trace(self, endpoint: str) -> bool:
+        if DASHBOARD_TRACEMALLOC_RATE <= 0:
+            return False
+        return not self._stats(endpoint)["measured"] or random.random() < DASHBOARD_TRACEMALLOC_RATE
+
+    def release(self, plan: LoadPlan):
+        with self._lock:
+            self.in_flight_bytes -= plan.reserved
+
+    # Records a measured load; the per-document estimate follows increases at once and decreases slowly
+    def learn(self, endpoint: str, documents: int, peak: Optional[int]):
+        stats = self._stats(endpoint)
+        stats["loads"] += 1
+        stats["last_documents"] = documents
+        if peak is None:
+            return
+        stats["last_peak_bytes"] = peak
+        stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak)
+        if documents >= DASHBOARD_LEARN_MIN_DOCS:
+            observed = peak / documents
+            if stats["measured"]:
+                observed = max(observed, (stats["bytes_per_doc"] + observed) / 2)
+            stats["bytes_per_doc"] = int(observed)
+            stats["measured"] = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "over_budget": self.mode,
+            "degraded_days": self.degraded_days,
+            "tracemalloc_rate": DASHBOARD_TRACEMALLOC_RATE,
+            "in_flight_bytes": self.in_flight_bytes,
+            "rss_bytes": rss_bytes(),
+            "endpoints": {name: dict(stats) for name, stats in self._endpoints.items()},
+        }
+
+
+DASHBOARD_MEMORY = DashboardMemoryBudget()
+
+
+# 503 for a load that does not fit in the budget, so the worker answers fast instead of risking an OOM kill
+def over_budget_response() -> Response:
+    response = jsonify({
+        "error": "Dashboard data is too large to load right now, try again later",
+        "retry_after_seconds": DASHBOARD_RETRY_AFTER_SECONDS,
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = str(DASHBOARD_RETRY_AFTER_SECONDS)
+    return response
+
+
+# Response header telling the caller a load was truncated to the requests created since the given date
+DEGRADED_HEADER = "X-Dashboard-Degraded"
+
+
+# Runs a whole-collection load under the budget and measures it. load(since) returns the response and the
+# number of documents it read; degraded responses keep their shape and carry the DEGRADED_HEADER.
+def run_within_budget(endpoint: str, count: Callable[[Optional[datetime]], int],
+                      load: Callable[[Optional[datetime]], Tuple[Any, int]]):
+    plan = DASHBOARD_MEMORY.admit(endpoint, count)
+    if plan is None:
+        return over_budget_response()
+    try:
+        with track_memory(endpoint, DASHBOARD_MEMORY.should_trace(endpoint)) as usage:
+            response, documents = load(plan.since)
+    finally:
+        DASHBOARD_MEMORY.release(plan)
+    DASHBOARD_MEMORY.learn(endpoint, documents, usage.peak)
+    if plan.since is not None and isinstance(response, Response):
+        response.headers[DEGRADED_HEADER] = f"since={plan.since:%Y-%m-%d}"
+    return response
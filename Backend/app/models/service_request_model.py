@@ -1,6 +1,98 @@
 from datetime import datetime
 from bson import ObjectId
 
+# String formats "Created on" / "Resolved date" / "Update date" were stored in before they became BSON dates
+LEGACY_DATETIME_FORMATS = (
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y",
+)
+
+# $dateFromString of a string in one strptime format, evaluating to on_error when it does not match
+def _date_from_string(value, fmt, on_error):
+    spec = {"dateString": value, "onError": on_error, "onNull": None}
+    if fmt is not None:
+        spec["format"] = fmt
+    return {"$dateFromString": spec}
+
+
+# MongoDB has no %I / %p: the time is parsed as 24-hour without the AM/PM marker, then shifted to the afternoon
+# for PM (12 AM is midnight, 12 PM noon); hours outside 1-12 fall through to on_error, as they do in strptime
+def _twelve_hour_date_from_string(value, fmt, on_error):
+    twenty_four_hour = fmt.replace("%I", "%H").replace("%p", "").strip()
+    hour = {"$hour": "$$parsed"}
+    return {"$let": {
+        "vars": {"marker": {"$regexFind": {"input": value, "regex": r"^(.*\S)\s+([AP]M)$", "options": "i"}}},
+        "in": {"$cond": [
+            {"$eq": ["$$marker", None]},
+            on_error,
+            {"$let": {
+                "vars": {
+                    "parsed": _date_from_string({"$arrayElemAt": ["$$marker.captures", 0]}, twenty_four_hour, None),
+                    "pm": {"$eq": [{"$toUpper": {"$arrayElemAt": ["$$marker.captures", 1]}}, "PM"]},
+                },
+                "in": {"$cond": [
+                    {"$or": [{"$eq": ["$$parsed", None]}, {"$lt": [hour, 1]}, {"$gt": [hour, 12]}]},
+                    on_error,
+                    {"$add": ["$$parsed", {"$multiply": [
+                        {"$subtract": [{"$cond": ["$$pm", 12, 0]}, {"$cond": [{"$eq": [hour, 12]}, 12, 0]}]},
+                        3600000,
+                    ]}]},
+                ]},
+            }},
+        ]},
+    }}
+
+
+# Aggregation expression for a date field as a BSON date. Unmigrated string values are parsed like
+# parse_request_datetime: each legacy format in order, then ISO 8601; anything else is null.
+def date_field_expression(field: str) -> dict:
+    parsed = _date_from_string("$$text", None, None)
+    for fmt in reversed(LEGACY_DATETIME_FORMATS):
+        if "%p" in fmt:
+            parsed = _twelve_hour_date_from_string("$$text", fmt, parsed)
+        else:
+            parsed = _date_from_string("$$text", fmt, parsed)
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": [{"$type": f"${field}"}, "date"]}, "then": f"${field}"},
+                {"case": {"$eq": [{"$type": f"${field}"}, "string"]},
+                 "then": {"$let": {"vars": {"text": {"$trim": {"input": f"${field}"}}}, "in": parsed}}},
+            ],
+            "default": None,
+        }
+    }
+
+
+CREATED_ON_AS_DATE = date_field_expression("Created on")
+
+
+# Converts a stored date value (native datetime or any legacy string format) to a datetime, or None
+def parse_request_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    for fmt in LEGACY_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+# Formats a stored date value for API responses, keeping the string shape clients already parse
+def format_request_datetime(value, fmt: str = "%m/%d/%Y %H:%M"):
+    if isinstance(value, datetime):
+        return value.strftime(fmt)
+    return value
+
 
 # Data model class for service requests with parsing and serialization capabilities
 class ServiceRequest:
@@ -20,12 +112,9 @@ class ServiceRequest:
         self.request_description = data.get('Request description', '')
         self.is_overdue = data.get('is_overdue', 0)
 
-    # Parses datetime strings from database format to Python datetime objects
-    def _parse_datetime(self, date_str):
-        try:
-            return datetime.strptime(date_str, "%m/%d/%Y %H:%M")
-        except (ValueError, TypeError):
-            return None
+    # Parses stored dates (BSON datetimes or legacy strings) to Python datetime objects
+    def _parse_datetime(self, value):
+        return parse_request_datetime(value)
 
     # Converts the service request object to a dictionary for API responses
     def to_dict(self):
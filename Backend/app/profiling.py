@@ -0,0 +1,165 @@
+import hmac
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from flask import Flask, g, request
+
+load_dotenv()
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+# "1" profiles PROFILE_SAMPLE_RATE of the requests to PROFILE_BLUEPRINTS
+PROFILING_ENABLED = os.getenv("PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_BLUEPRINTS = {b.strip() for b in os.getenv("PROFILE_BLUEPRINTS", "dashboard,service_requests,predict_bp").split(",") if b.strip()}
+# Requests to those blueprints carrying "X-Profile: <token>" are always profiled, even with PROFILING=0
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(BACKEND_DIR, "profiles")
+# Oldest profiles are deleted beyond this many files
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "500"))
+PROFILE_FILE_SUFFIX = ".folded"
+
+
+# Short, stable label of a frame: path relative to the backend, site-packages or the standard library,
+# plus the function name
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(BACKEND_DIR):
+        path = os.path.relpath(path, BACKEND_DIR)
+    elif path.startswith(STDLIB_DIR) and "site-packages" not in path:
+        path = os.path.relpath(path, STDLIB_DIR)
+    else:
+        marker = path.rfind("site-packages")
+        if marker != -1:
+            path = path[marker + len("site-packages") + 1:]
+    return f"{path}:{code.co_name}".replace(" ", "_").replace(";", "_")
+
+
+# Stack of a frame in collapsed format, outermost frame first
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+# Samples the stacks of the threads currently serving profiled requests, every interval_ms. The sampler needs the
+# GIL to take a sample, so requests much shorter than the interval may end with no samples (and no file).
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    # Starts the sampler thread on first use in each process (threads do not survive a fork)
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._active.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    # Starts sampling the calling thread
+    def begin(self):
+        with self._lock:
+            self._ensure_thread()
+            self._active[threading.get_ident()] = Counter()
+        self._wake.set()
+
+    # Stops sampling the calling thread and returns its stack counts
+    def end(self) -> Optional[Counter]:
+        with self._lock:
+            return self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, counts in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        counts[_collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+PROFILER = SamplingProfiler()
+
+
+# Writes one request's stack counts as a collapsed-stack file, then deletes the oldest files beyond the limit
+def write_profile(counts: Counter, endpoint: str, duration_ms: float) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{slug}_{duration_ms:.0f}ms{PROFILE_FILE_SUFFIX}"
+    with open(os.path.join(PROFILE_DIR, name), "w", encoding="utf-8") as file:
+        for stack, count in counts.most_common():
+            file.write(f"{stack} {count}\n")
+
+    profiles = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(PROFILE_FILE_SUFFIX))
+    for old in profiles[:-PROFILE_MAX_FILES] if PROFILE_MAX_FILES > 0 else []:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old))
+        except OSError:
+            pass
+    return name
+
+
+# Whether this request should be profiled: a profiled blueprint, and either the privileged header or the sample
+def _should_profile() -> bool:
+    if request.blueprint not in PROFILE_BLUEPRINTS:
+        return False
+    if PROFILE_TOKEN and hmac.compare_digest(request.headers.get("X-Profile", ""), PROFILE_TOKEN):
+        return True
+    return PROFILING_ENABLED and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _before_request():
+    if _should_profile():
+        g.profile_started = time.perf_counter()
+        PROFILER.begin()
+
+
+def _after_request(response):
+    started = g.pop("profile_started", None)
+    if started is None:
+        return response
+    counts = PROFILER.end()
+    if counts:
+        endpoint = request.url_rule.rule if request.url_rule is not None else request.path
+        try:
+            response.headers["X-Profile-File"] = write_profile(counts, endpoint, (time.perf_counter() - started) * 1000)
+        except OSError as e:
+            print(f"Failed to write profile: {e}")
+    return response
+
+
+# Stops sampling a request that ended without a response (after_request did not run)
+def _teardown_request(exc):
+    if g.pop("profile_started", None) is not None:
+        PROFILER.end()
+
+
+# Installs the profiling hooks when profiling can be triggered at all (PROFILING=1 or a PROFILE_TOKEN)
+def init_profiling(app: Flask):
+    if not (PROFILING_ENABLED or PROFILE_TOKEN):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -3,7 +3,7 @@ import os
 from flask import Blueprint, jsonify, request
 import jwt
 from dotenv import load_dotenv
-from app.db import get_collection, update_user_account_info, update_user_dashboard_preferences, update_user_privacy_settings
+from app.db import DATABASE_NAME, get_collection, update_user_account_info, update_user_dashboard_preferences, update_user_privacy_settings
 
 load_dotenv()
 
@@ -16,7 +16,7 @@ def login():
     data = request.get_json()
     Emp_id = data.get('EmpID') or data.get('emp_id')
     Password = data.get('Password') or data.get('password')
-    collection = get_collection("DS_PROJECT", "users")
+    collection = get_collection(DATABASE_NAME, "users")
 
     print(data)
     if collection is not None:
@@ -46,7 +46,7 @@ def update_username():
         
         print(f"Update username - EmpID: {emp_id}, New username: {new_username}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -88,7 +88,7 @@ def update_password():
         print(f"Current password provided: {current_password}")
         print(f"New password: {new_password}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -143,7 +143,7 @@ def update_account_info():
         
         print(f"Update account info - EmpID: {emp_id}, Data: {account_data}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -196,7 +196,7 @@ def update_dashboard_preferences():
         
         print(f"Update dashboard preferences - EmpID: {emp_id}, Data: {dashboard_data}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -242,7 +242,7 @@ def update_privacy_settings():
         
         print(f"Update privacy settings - EmpID: {emp_id}, Data: {privacy_data}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -283,7 +283,7 @@ def get_user_preferences():
             
         print(f"Get user preferences - EmpID: {emp_id}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -334,7 +334,7 @@ def update_preferences():
         
         print(f"Update preferences - EmpID: {emp_id}, Dark mode: {dark_mode}, Notifications: {notifications_enabled}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -371,7 +371,7 @@ def update_preferences():
 @auth_bp.route('/debug-users', methods=['GET'])
 def debug_users():
     try:
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
@@ -393,7 +393,7 @@ def delete_account():
         
         print(f"Delete account - EmpID: {emp_id}")
         
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             return jsonify({"error": "Database connection failed"}), 500
             
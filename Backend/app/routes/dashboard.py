@@ -1,30 +1,54 @@
 import app.services.dashboard_service as dashboard_service
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from app.db import get_collection
 import os
 from dotenv import load_dotenv
-import pandas as pd
+from datetime import datetime, timedelta
 
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
 
+# The dashboard services return a response or a (response, status) tuple; routes pass it through unchanged so
+# 404s, 503s and DB errors keep their status
+
+
 # Retrieves dashboard data organized by years and months for visualization
 @dashboard_bp.route("/api/dashboard", methods=["GET"])
 def get_dashboard_data():
     try:
-        result = dashboard_service.get_dashboard_data_by_years_and_months()
-        return result, 200
+        return dashboard_service.get_dashboard_data_by_years_and_months()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
+# Parses an optional YYYY-MM-DD query parameter
+def _parse_date_arg(name: str):
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
 # Retrieves time-based data for dashboard charts and analytics
+# ?mode=rates returns per-site opening/closing rate series instead of raw ticket dates,
+# optionally limited by start/end (YYYY-MM-DD, end inclusive) and bucketed by granularity (day/week/month)
 @dashboard_bp.route("/api/dashboard-data", methods=["GET"])
 def get_time_data_route():
     try:
-        result = dashboard_service.get_time_data()
-        return result, 200
+        if request.args.get("mode") == "rates":
+            granularity = request.args.get("granularity", "day")
+            if granularity not in dashboard_service.RATE_GRANULARITIES:
+                return jsonify({"error": f"granularity must be one of {', '.join(dashboard_service.RATE_GRANULARITIES)}"}), 400
+            try:
+                start = _parse_date_arg("start")
+                end = _parse_date_arg("end")
+            except ValueError:
+                return jsonify({"error": "start and end must be dates in YYYY-MM-DD format"}), 400
+            if end is not None:
+                end += timedelta(days=1)
+            return dashboard_service.get_time_rates(start, end, granularity)
+        return dashboard_service.get_time_data()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -33,8 +57,7 @@ def get_time_data_route():
 @dashboard_bp.route("/api/num-open-requests", methods=["GET"])
 def get_num_of_open_requests_route():
     try:
-        result = dashboard_service.get_num_of_open_requests()
-        return result, 200
+        return dashboard_service.get_num_of_open_requests()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -43,8 +66,7 @@ def get_num_of_open_requests_route():
 @dashboard_bp.route("/api/dashboard-open-requests", methods=["GET"])
 def get_open_requests_dashboard_route():
     try:
-        result = dashboard_service.get_open_requests_dashboard_data()
-        return result, 200
+        return dashboard_service.get_open_requests_dashboard_data()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
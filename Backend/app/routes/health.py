@@ -0,0 +1,58 @@
+from flask import Blueprint, jsonify
+from app.db import get_pool_stats
+from app.services.predictors.prediction_cache import cache_stats
+from app.services.predictors.warmup import MODEL_WARMUP, start_warmup
+from app.services.predictors.hot_swap import MODEL_WATCHER
+from app.services.predictors.micro_batcher import MICRO_BATCH_ENABLED
+from app.services.predictors.overdue_risk_predictor import OVERDUE_BATCHER
+from app.services.predictors.predict_response_time import DURATION_BATCHER
+from app.services.async_scoring import SCORING_POOL
+from app.memory_budget import DASHBOARD_MEMORY
+
+health_bp = Blueprint("health", __name__, url_prefix="/healthz")
+
+
+# Returns MongoDB connection pool settings and checkout/wait/connection counters for this worker
+@health_bp.route("/db-pool", methods=["GET"])
+def db_pool_stats():
+    return jsonify(get_pool_stats()), 200
+
+
+# Returns hit/miss/eviction counters of the overdue and duration prediction caches
+@health_bp.route("/prediction-cache", methods=["GET"])
+def prediction_cache_stats():
+    return jsonify(cache_stats()), 200
+
+
+# Reports whether this worker has loaded its models and finished warming up; 503 until it has
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    report = MODEL_WARMUP.report()
+    if not report["ready"]:
+        # With MODEL_WARMUP_ON_STARTUP=0 nothing loads until first use, so the first probe starts the warm-up in the
+        # background instead of waiting for traffic the orchestrator will not route; a no-op once it has started
+        start_warmup()
+    report["model_watcher"] = MODEL_WATCHER.status()
+    return jsonify(report), 200 if report["ready"] else 503
+
+
+# Returns queue depth, batch size and wait-time counters of the overdue and duration micro-batchers
+@health_bp.route("/micro-batcher", methods=["GET"])
+def micro_batcher_stats():
+    return jsonify({
+        "enabled": MICRO_BATCH_ENABLED,
+        "overdue": OVERDUE_BATCHER.stats(),
+        "duration": DURATION_BATCHER.stats(),
+    }), 200
+
+
+# Returns in-flight, completed and inline-fallback counters of the background ticket scoring pool
+@health_bp.route("/async-scoring", methods=["GET"])
+def async_scoring_stats():
+    return jsonify(SCORING_POOL.stats()), 200
+
+
+# Returns the dashboard memory budget, the memory reserved by running loads and per-endpoint peaks of this worker
+@health_bp.route("/dashboard-memory", methods=["GET"])
+def dashboard_memory_stats():
+    return jsonify(DASHBOARD_MEMORY.stats()), 200
@@ -0,0 +1,12 @@
+from flask import Blueprint
+
+from app.timing import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+# Prometheus scrape endpoint: request and span latency histograms
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render_metrics()
+    return body, 200, {"Content-Type": content_type}
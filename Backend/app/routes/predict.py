@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
+import os
 from app.services.predictors.overdue_risk_predictor import predict_combined_risk
+from app.services.predictors.prediction_pipeline import predict_batch
 
 predict_bp = Blueprint("predict_bp", __name__, url_prefix="/predict")
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "5000"))
 
 
 # Predicts the risk of a service request becoming overdue using machine learning models
@@ -13,3 +16,22 @@ def predict():
 
     result = predict_combined_risk(data)
     return jsonify({"is_overdue": result})
+
+
+# Scores a list of tickets at once; accepts a JSON list or {"tickets": [...]} and returns results in input order
+@predict_bp.route("/batch", methods=["POST"])
+def predict_batch_route():
+    data = request.get_json()
+    tickets = data.get("tickets") if isinstance(data, dict) else data
+    if not isinstance(tickets, list) or not tickets:
+        return jsonify({"error": "Expected a non-empty list of tickets"}), 400
+    if len(tickets) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch size {len(tickets)} exceeds the limit of {MAX_BATCH_SIZE}"}), 413
+    if not all(isinstance(t, dict) for t in tickets):
+        return jsonify({"error": "Every ticket must be a JSON object"}), 400
+
+    try:
+        results = predict_batch(tickets)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"count": len(results), "results": results})
@@ -5,11 +5,13 @@ from flask import Blueprint
 from app.services.service_request_logic import (
     create_new_service_request,
     get_open_requests,
-    calculate_sla,
+    close_service_request,
+    get_ticket_prediction,
 )
+from app.services.async_scoring import ASYNC_SCORING_ENABLED, SCORING_POOL
 from app.services.predictors.predict_response_time import predict_response_time
-from app.services.predictors.overdue_risk_predictor import predict_combined_risk
-from app.services.reconciliation.prediction_reconciler import reconcile_predictions
+from app.services.predictors.parallel_inference import PARALLEL_INFERENCE_ENABLED
+from app.services.predictors.prediction_pipeline import predict_and_create_ticket, predict_ticket
 
 service_requests_bp = Blueprint("service_requests", __name__)
 
@@ -18,53 +20,90 @@ service_requests_bp = Blueprint("service_requests", __name__)
 def create_ticket():
     payload = request.get_json()
 
+    # With ASYNC_SCORING=1 the ticket is stored right away and scored in the background,
+    # unless the scoring pool is saturated, in which case it is scored inline as below
+    if ASYNC_SCORING_ENABLED and SCORING_POOL.try_reserve():
+        try:
+            ticket_meta = create_new_service_request(payload)
+        except Exception as e:
+            SCORING_POOL.release()
+            return jsonify({"error": str(e)}), 500
+        SCORING_POOL.submit(ticket_meta["request_id"], payload)
+        return jsonify({
+            "request_id": ticket_meta["request_id"],
+            "prediction_status": "pending",
+            "sla_hours": ticket_meta["sla_time"],
+            "sla_time": ticket_meta["sla_time"],
+            "prediction_url": f"/api/tickets/{ticket_meta['request_id']}/prediction",
+        }), 202
+
     try:
-        ticket_meta = create_new_service_request(payload)
+        if PARALLEL_INFERENCE_ENABLED:
+            prediction, ticket_meta = predict_and_create_ticket(payload)
+        else:
+            prediction = predict_ticket(payload)
+            ticket_meta = create_new_service_request(payload, prediction)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    try:
-        sla_hours = calculate_sla(payload.get("SubCategory", ""))
-
-        predicted_hours = float(predict_response_time(payload))
-
-        prob_overdue = float(predict_combined_risk(payload))
-
-        fused = reconcile_predictions(predicted_hours, prob_overdue, sla_hours, w=0.5)
-
-        recs = []
-        if fused["risk_bucket"] == "High":
-            recs.append("Assign senior technician now")
-        if fused["predicted_hours"] > fused["sla_hours"]:
-            recs.append("Notify customer about expected delay")
-
-        
-        resp = {
-            "request_id": ticket_meta.get("request_id"),
-            "predicted_hours": fused["predicted_hours"],        
-            "sla_hours": fused["sla_hours"],
-            "overdue_probability": fused["prob_final"],
-            "risk_bucket": fused["risk_bucket"],
-            "recommendations": recs,
-            "sla_time": fused["sla_hours"],
-            "risk_score": fused["prob_final"],
-        }
-        return jsonify(resp), 201
-
-    except Exception as e:
-        fallback_sla = calculate_sla(payload.get("SubCategory", ""))
+    fused = prediction.fused
+    if fused is None:
         return jsonify({
             "request_id": ticket_meta.get("request_id"),
             "predicted_hours": None,                          
-            "sla_hours": fallback_sla,
+            "sla_hours": prediction.sla_hours,
             "overdue_probability": None,
             "risk_bucket": None,
             "recommendations": [],
-            "sla_time": fallback_sla,
+            "sla_time": prediction.sla_hours,
             "risk_score": None,
-            "error": f"prediction failed {str(e)}",
+            "timings_ms": prediction.timings,
+            "error": f"prediction failed {prediction.error}",
         }), 201
 
+    recs = []
+    if fused["risk_bucket"] == "High":
+        recs.append("Assign senior technician now")
+    if fused["predicted_hours"] > fused["sla_hours"]:
+        recs.append("Notify customer about expected delay")
+
+    resp = {
+        "request_id": ticket_meta.get("request_id"),
+        "predicted_hours": fused["predicted_hours"],        
+        "sla_hours": fused["sla_hours"],
+        "overdue_probability": fused["prob_final"],
+        "risk_bucket": fused["risk_bucket"],
+        "recommendations": recs,
+        "sla_time": fused["sla_hours"],
+        "risk_score": fused["prob_final"],
+        "timings_ms": prediction.timings,
+    }
+    return jsonify(resp), 201
+
+
+# Returns the stored prediction of a ticket; 202 while background scoring is still pending
+@service_requests_bp.route('/api/tickets/<request_id>/prediction', methods=['GET'])
+def get_ticket_prediction_route(request_id):
+    try:
+        result = get_ticket_prediction(request_id)
+        if result is None:
+            return jsonify({"error": "Request not found"}), 404
+        return jsonify(result), 202 if result["prediction_status"] == "pending" else 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Closes an open service request
+@service_requests_bp.route('/api/tickets/<request_id>/close', methods=['POST'])
+def close_ticket(request_id):
+    try:
+        result = close_service_request(request_id)
+        if result is None:
+            return jsonify({"error": "Open request not found"}), 404
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
 # Predicts the expected response time duration for a service request
 @service_requests_bp.route('/api/predict-duration', methods=['POST'])
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from app.services.predictors.prediction_pipeline import predict_ticket
+from app.services.service_request_logic import save_ticket_prediction
+
+load_dotenv()
+# Off by default: POST /api/tickets scores before inserting and returns the prediction in its response
+ASYNC_SCORING_ENABLED = os.getenv("ASYNC_SCORING", "0") == "1"
+ASYNC_SCORING_WORKERS = int(os.getenv("ASYNC_SCORING_WORKERS", "2"))
+# Tickets allowed to wait for a worker; beyond this new tickets are scored synchronously (backpressure)
+ASYNC_SCORING_MAX_PENDING = int(os.getenv("ASYNC_SCORING_MAX_PENDING", "64"))
+
+
+# Scores already inserted tickets on a bounded worker pool and writes the results back onto their documents
+class ScoringPool:
+    def __init__(self, workers: int = ASYNC_SCORING_WORKERS, max_pending: int = ASYNC_SCORING_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.score_ms_total = 0.0
+
+    # Creates the executor on first use in each process (worker threads do not survive a fork)
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+                self.in_flight = 0
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ticket-scoring")
+            return self._executor
+
+    # Reserves room for one more ticket; False means the pool is saturated and the caller should score inline
+    def try_reserve(self) -> bool:
+        self._ensure_executor()
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    # Gives back a reservation that will not be submitted (e.g. the insert failed)
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    # Queues scoring of an inserted ticket; must follow a successful try_reserve
+    def submit(self, request_id: str, payload: dict):
+        self.submitted += 1
+        self._ensure_executor().submit(self._score, request_id, payload)
+
+    def _score(self, request_id: str, payload: dict):
+        start = time.perf_counter()
+        try:
+            prediction = predict_ticket(payload)
+            save_ticket_prediction(request_id, prediction)
+            if prediction.fused is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Async scoring of ticket {request_id} failed: {e}")
+            try:
+                save_ticket_prediction(request_id, error=str(e))
+            except Exception as write_error:
+                print(f"Failed to mark ticket {request_id} as failed: {write_error}")
+        finally:
+            self.score_ms_total += (time.perf_counter() - start) * 1000
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "enabled": ASYNC_SCORING_ENABLED,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "scored_inline": self.rejected,
+            "avg_score_ms": round(self.score_ms_total / finished, 3) if finished else 0.0,
+        }
+
+
+SCORING_POOL = ScoringPool()
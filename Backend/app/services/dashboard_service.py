@@ -1,22 +1,76 @@
 from flask import Blueprint, jsonify
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
 import os
 from dotenv import load_dotenv
-import pandas as pd
+from app.models.service_request_model import format_request_datetime, date_field_expression, CREATED_ON_AS_DATE
+from datetime import datetime, timedelta
+from app.services import rollup_service
+from app.memory_budget import run_within_budget, track_memory
 
 load_dotenv()
 dashboard_bp = Blueprint("dashboard", __name__)
-DATABASE_NAME = os.getenv("DATABASE_NAME")    
+# Serve category/weekday counts from the daily_rollups collection instead of scanning the request collections
+USE_ROLLUPS = os.getenv("DASHBOARD_USE_ROLLUPS", "0") == "1"
 
 ###########################################################################################
 # Retrieves dashboard data for open requests including breakdowns by site, category and weekday
 def get_open_requests_dashboard_data():
+    if USE_ROLLUPS:
+        return _open_requests_dashboard_from_rollups()
+
     collection = get_collection(DATABASE_NAME, "newRequests")
     if collection is None:
         return jsonify({"error": "DB connection failed"}), 500
 
-    data = list(collection.find({}))
-    df = pd.DataFrame(data)
+    # Imported before the load is measured, so its one-off allocations are not counted against the load
+    import pandas  # noqa: F401
+
+    return run_within_budget("/api/dashboard-open-requests", _document_count(collection),
+                             lambda since: _load_open_requests_dashboard(collection, since))
+
+
+OPEN_REQUESTS_FIELDS = ("Site", "MainCategory", "SubCategory", "Created on")
+TIME_DATA_FIELDS = ("Site", "Created on", "Resolved date", "Update date")
+
+
+# Filter of requests whose "Created on" compares with op ("$gte", "$lt", ...) to a date. Native dates compare
+# directly on the created_on index; legacy string dates not yet converted by migrate_dates.py are compared through
+# CREATED_ON_AS_DATE, since a date bound alone never matches a string.
+def _created_on_bound(op: str, date: datetime) -> dict:
+    return {"$or": [
+        {"Created on": {op: date}},
+        {"Created on": {"$type": "string"}, "$expr": {op: [CREATED_ON_AS_DATE, date]}},
+    ]}
+
+
+# Filter of a dashboard load: the whole collection, or (degraded) the requests created since a date
+def _created_since(since=None) -> dict:
+    return {} if since is None else _created_on_bound("$gte", since)
+
+
+# Document counter for the memory budget; the full count comes from collection metadata, without a scan
+def _document_count(collection):
+    def count(since):
+        if since is None:
+            return collection.estimated_document_count()
+        return collection.count_documents(_created_since(since))
+    return count
+
+
+# Builds the open requests dashboard from the collection; returns the response and the number of documents read
+def _load_open_requests_dashboard(collection, since=None):
+    import pandas as pd
+
+    # Only the projected fields are read, straight into per-column lists, so whole documents are never held
+    # next to the DataFrame
+    columns = {field: [] for field in OPEN_REQUESTS_FIELDS}
+    documents = 0
+    for item in collection.find(_created_since(since), {field: 1 for field in OPEN_REQUESTS_FIELDS}):
+        documents += 1
+        for field, values in columns.items():
+            values.append(item.get(field))
+    df = pd.DataFrame(columns)
+    del columns
 
     # Ensure datetime format
     df["Created on"] = pd.to_datetime(df["Created on"], errors="coerce")
@@ -50,7 +104,7 @@ def get_open_requests_dashboard_data():
         # Assign site result to final result
         result[site] = site_result
 
-    return jsonify(result)
+    return jsonify(result), documents
 
 
 
@@ -61,10 +115,18 @@ def get_time_data():
     if collection is None:
         return jsonify({"error": "DB connection failed"}), 500
 
-    data = list(collection.find({}))  
+    return run_within_budget("/api/dashboard-data", _document_count(collection),
+                             lambda since: _load_time_data(collection, since))
+
+
+# Builds the per-site created/closed dates from the collection; returns the response and the number of documents read
+def _load_time_data(collection, since=None):
     results = {'A': [], 'B': [], 'C': []}
+    documents = 0
 
-    for item in data:
+    # Streamed from the cursor with only the needed fields, instead of materialising the collection first
+    for item in collection.find(_created_since(since), {field: 1 for field in TIME_DATA_FIELDS}):
+        documents += 1
         site = item.get('Site') 
         created_on = item.get('Created on')
         resolved_date = item.get('Resolved date')
@@ -75,98 +137,214 @@ def get_time_data():
         if site and created_on and closed_at:
             if site in results:
                 results[site].append({
-                    'created_on': created_on,
-                    'closed_at': closed_at
+                    'created_on': format_request_datetime(created_on),
+                    'closed_at': format_request_datetime(closed_at)
                 })
 
     if not any(results.values()):
-        return jsonify({"message": "No requests found with valid dates"}), 404
+        response = jsonify({"message": "No requests found with valid dates"})
+        response.status_code = 404
+        return response, documents
     
+    return jsonify(results), documents
+
+####################################################################################################
+RATE_GRANULARITIES = ("day", "week", "month")
+
+
+# Maps a "YYYY-MM-DD" day to the first day of its bucket: the day itself, its Monday, or the 1st of its month
+def _bucket_start(day: str, granularity: str) -> str:
+    if granularity == "day":
+        return day
+    date = datetime.strptime(day, "%Y-%m-%d")
+    if granularity == "week":
+        date -= timedelta(days=date.weekday())
+    else:
+        date = date.replace(day=1)
+    return date.strftime("%Y-%m-%d")
+
+
+# Builds the pipeline that counts tickets opened and closed per site and day
+def _time_rates_pipeline(start=None, end=None):
+    # closed_at falls back from "Resolved date" to "Update date", as in get_time_data
+    closed_at = {"$ifNull": [date_field_expression("Resolved date"), date_field_expression("Update date")]}
+    match = {"Site": {"$in": SITES}}
+    if end is not None:
+        # Nothing created after the range can open or close inside it; this bound can use the Site/Created on index
+        match.update(_created_on_bound("$lt", end))
+
+    def in_range(field):
+        bounds = {"$type": "date"}
+        if start is not None:
+            bounds["$gte"] = start
+        if end is not None:
+            bounds["$lt"] = end
+        return {"$match": {field: bounds}}
+
+    def per_day(field):
+        return {"$group": {
+            "_id": {"site": "$Site", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}}},
+            "count": {"$sum": 1},
+        }}
+
+    return [
+        {"$match": match},
+        {"$project": {"Site": 1, "created": CREATED_ON_AS_DATE, "closed": closed_at}},
+        {"$match": {"created": {"$type": "date"}, "closed": {"$type": "date"}}},
+        {"$facet": {
+            "opening_rate": [in_range("created"), per_day("created")],
+            "closing_rate": [in_range("closed"), per_day("closed")],
+        }},
+    ]
+
+
+# Retrieves per-site opening and closing rate series, bucketed per day, week or month, within an optional date range
+def get_time_rates(start=None, end=None, granularity="day"):
+    collection = get_collection(DATABASE_NAME, "service_requests")
+    if collection is None:
+        return jsonify({"error": "DB connection failed"}), 500
+
+    facets = next(collection.aggregate(_time_rates_pipeline(start, end), allowDiskUse=True), {})
+
+    results = {site: {"opening_rate": [], "closing_rate": []} for site in SITES}
+    for series, rows in facets.items():
+        buckets = {}
+        for row in rows:
+            key = (row["_id"]["site"], _bucket_start(row["_id"]["day"], granularity))
+            buckets[key] = buckets.get(key, 0) + row["count"]
+        for (site, date), count in sorted(buckets.items()):
+            results[site][series].append({"date": date, series: int(count)})
+
+    if not any(results[site]["opening_rate"] for site in SITES):
+        return jsonify({"message": "No requests found with valid dates"}), 404
+
     return jsonify(results)
 
 ##################################################################################################3
+SITES = ['A', 'B', 'C']
+WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+
+# Builds the pipeline that returns per site/year/month counts by main category, sub category and weekday
+def _years_and_months_pipeline():
+    period = {"site": "$Site", "year": {"$year": "$created"}, "month": {"$month": "$created"}}
+    return [
+        {"$match": {"Site": {"$in": SITES}}},
+        {"$project": {"Site": 1, "MainCategory": 1, "SubCategory": 1, "created": CREATED_ON_AS_DATE}},
+        {"$match": {"created": {"$type": "date"}}},
+        {"$facet": {
+            "main_category": [
+                {"$group": {"_id": {**period, "value": "$MainCategory"}, "count": {"$sum": 1}}},
+            ],
+            "sub_category": [
+                {"$group": {"_id": {**period, "value": "$SubCategory"}, "count": {"$sum": 1}}},
+            ],
+            "by_weekday": [
+                {"$group": {"_id": {**period, "value": {"$dayOfWeek": "$created"}}, "count": {"$sum": 1}}},
+            ],
+        }},
+    ]
+
+
+# Turns {value: count} into the [{label: value, "count": n}] list shape, most frequent first
+def _count_list(counts: dict, label: str) -> list:
+    ordered = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return [{label: k, "count": int(v)} for k, v in ordered]
+
+
+# Turns {weekday index: count} into the by_weekday list shape with all seven days present
+def _weekday_list(counts: dict) -> list:
+    return [{"weekday": day, "count": int(counts.get(i, 0))} for i, day in enumerate(WEEKDAYS)]
+
+
+# Builds the per-period response block from grouped category and weekday counts
+def _period_result(main: dict, sub: dict, weekdays: dict) -> dict:
+    return {
+        "main_category": _count_list(main, "category"),
+        "sub_category": _count_list(sub, "subcategory"),
+        "by_weekday": _weekday_list(weekdays),
+    }
+
+
+# Flattens $facet output into {(period..., facet, value): count}; weekday values become 0-based (0 = Sunday)
+def _facet_groups(facets: dict, period_keys: tuple) -> dict:
+    groups = {}
+    for facet, rows in facets.items():
+        for row in rows:
+            key = row["_id"]
+            value = key.get("value")
+            if value is None:
+                continue
+            if facet == "by_weekday":
+                value -= 1
+            period = tuple(key.get(k) for k in period_keys)
+            groups[period + (facet, value)] = groups.get(period + (facet, value), 0) + row["count"]
+    return groups
+
+
+# Assembles the site -> year -> yearly/monthly response from (site, year, month, facet, value) -> count groups
+def _years_and_months_result(groups: dict) -> dict:
+    tree = {}
+    for (site, year, month, facet, value), count in groups.items():
+        months = tree.setdefault(site, {}).setdefault(year, {})
+        for bucket in (months.setdefault(month, {}), months.setdefault(None, {})):
+            facet_counts = bucket.setdefault(facet, {})
+            facet_counts[value] = facet_counts.get(value, 0) + count
+
+    result = {}
+    for site in SITES:
+        site_result = {}
+        for year, months in tree.get(site, {}).items():
+            year_result = {"yearly": {}, "monthly": {}}
+            for month, facets in months.items():
+                block = _period_result(facets.get("main_category", {}),
+                                       facets.get("sub_category", {}),
+                                       facets.get("by_weekday", {}))
+                if month is None:
+                    year_result["yearly"] = block
+                else:
+                    year_result["monthly"][MONTHS[month - 1]] = block
+            site_result[str(year)] = year_result
+        result[site] = site_result
+    return result
+
+
 # Retrieves comprehensive dashboard data organized by years and months with category breakdowns
 def get_dashboard_data_by_years_and_months():
     collection = get_collection(DATABASE_NAME, "service_requests")
     if collection is None:
         return jsonify({"error": "DB connection failed"}), 500
 
-    data = list(collection.find({}))
-    df = pd.DataFrame(data)
+    # Only grouped counts leave the database, so this endpoint is measured but needs no memory budget
+    with track_memory("/api/dashboard"):
+        if USE_ROLLUPS:
+            facets = rollup_service.grouped_counts("service_requests", SITES, ("year", "month"))
+        else:
+            facets = next(collection.aggregate(_years_and_months_pipeline(), allowDiskUse=True), {})
+        if facets is None:
+            return jsonify({"error": "DB connection failed"}), 500
 
-    # Ensure datetime format
-    df["Created on"] = pd.to_datetime(df["Created on"], errors="coerce")
-    df = df.dropna(subset=["Created on"])
-
-    # Extract components
-    df["Year"] = df["Created on"].dt.year
-    df["Month"] = df["Created on"].dt.month_name()
-    df["Weekday"] = df["Created on"].dt.day_name()
+        return jsonify(_years_and_months_result(_facet_groups(facets, ("site", "year", "month"))))
 
-    result = {}
 
-    for site in ['A', 'B', 'C']:
-        site_data = df[df["Site"] == site]
-        site_result = {}
+# Builds the open requests dashboard (per site category and weekday counts) from the daily rollups
+def _open_requests_dashboard_from_rollups():
+    facets = rollup_service.grouped_counts("newRequests", SITES)
+    if facets is None:
+        return jsonify({"error": "DB connection failed"}), 500
 
-        for year in site_data["Year"].unique():
-            year_data = site_data[site_data["Year"] == year]
-            year_result = {
-                "yearly": {},
-                "monthly": {}
-            }
-
-            # Yearly Aggregation
-            yearly_main = year_data["MainCategory"].value_counts().to_dict()
-            year_result["yearly"]["main_category"] = [
-                {"category": k, "count": int(v)} for k, v in yearly_main.items()
-            ]
-
-            yearly_sub = year_data["SubCategory"].value_counts().to_dict()
-            year_result["yearly"]["sub_category"] = [
-                {"subcategory": k, "count": int(v)} for k, v in yearly_sub.items()
-            ]
-
-            yearly_weekdays = (
-                year_data["Weekday"]
-                .value_counts()
-                .reindex(["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"], fill_value=0)
-                .to_dict()
-            )
-            year_result["yearly"]["by_weekday"] = [
-                {"weekday": k, "count": int(v)} for k, v in yearly_weekdays.items()
-            ]
-
-            # Monthly Aggregation
-            for month in year_data["Month"].unique():
-                month_data = year_data[year_data["Month"] == month]
-                month_result = {}
-
-                month_main = month_data["MainCategory"].value_counts().to_dict()
-                month_result["main_category"] = [
-                    {"category": k, "count": int(v)} for k, v in month_main.items()
-                ]
-
-                month_sub = month_data["SubCategory"].value_counts().to_dict()
-                month_result["sub_category"] = [
-                    {"subcategory": k, "count": int(v)} for k, v in month_sub.items()
-                ]
-
-                month_weekdays = (
-                    month_data["Weekday"]
-                    .value_counts()
-                    .reindex(["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"], fill_value=0)
-                    .to_dict()
-                )
-                month_result["by_weekday"] = [
-                    {"weekday": k, "count": int(v)} for k, v in month_weekdays.items()
-                ]
-
-                year_result["monthly"][month] = month_result
-
-            site_result[str(year)] = year_result
-        result[site] = site_result
+    counts = {}
+    for (site, facet, value), count in _facet_groups(facets, ("site",)).items():
+        counts.setdefault(site, {}).setdefault(facet, {})[value] = count
 
+    result = {}
+    for site in SITES:
+        facets_for_site = counts.get(site, {})
+        result[site] = _period_result(facets_for_site.get("main_category", {}),
+                                      facets_for_site.get("sub_category", {}),
+                                      facets_for_site.get("by_weekday", {}))
     return jsonify(result)
 
 
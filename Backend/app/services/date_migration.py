@@ -0,0 +1,93 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+import os
+
+from app.db import DATABASE_NAME, get_collection
+from app.models.service_request_model import parse_request_datetime
+
+load_dotenv()
+
+DATE_FIELDS = ["Created on", "Resolved date", "Update date"]
+
+# Collections whose date fields are converted, as (database, collection)
+MIGRATION_TARGETS = [
+    (DATABASE_NAME, "service_requests"),
+    (DATABASE_NAME, "newRequests"),
+]
+
+CHECKPOINT_COLLECTION = "migrations"
+MIGRATION_NAME = "native_dates"
+
+
+# Builds the $set payload that converts every legacy string date in a document; unparseable values are left alone
+def _converted_fields(document: dict) -> dict:
+    update = {}
+    for field in DATE_FIELDS:
+        value = document.get(field)
+        if isinstance(value, str):
+            parsed = parse_request_datetime(value)
+            if parsed is not None:
+                update[field] = parsed
+    return update
+
+
+# Converts string dates to BSON datetimes in batches, checkpointing the last processed _id so it can resume
+def migrate_collection(database_name: str, collection_name: str, batch_size: int = 1000, restart: bool = False) -> dict:
+    collection = get_collection(database_name, collection_name)
+    checkpoints = get_collection(database_name, CHECKPOINT_COLLECTION)
+    if collection is None or checkpoints is None:
+        return {"error": "DB connection failed"}
+
+    checkpoint_id = f"{MIGRATION_NAME}:{collection_name}"
+    if restart:
+        checkpoints.delete_one({"_id": checkpoint_id})
+    checkpoint = checkpoints.find_one({"_id": checkpoint_id}) or {}
+    last_id = checkpoint.get("last_id")
+
+    string_dates = {"$or": [{field: {"$type": "string"}} for field in DATE_FIELDS]}
+    projection = {field: 1 for field in DATE_FIELDS}
+    stats = {"scanned": 0, "converted": 0, "unparseable": 0, "resumed_from": str(last_id) if last_id else None}
+
+    while True:
+        query = dict(string_dates)
+        if last_id is not None:
+            query = {"$and": [string_dates, {"_id": {"$gt": last_id}}]}
+        batch = list(collection.find(query, projection).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for document in batch:
+            update = _converted_fields(document)
+            if update:
+                operations.append(UpdateOne({"_id": document["_id"]}, {"$set": update}))
+            else:
+                stats["unparseable"] += 1
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            stats["converted"] += result.modified_count
+        stats["scanned"] += len(batch)
+
+        last_id = batch[-1]["_id"]
+        checkpoints.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now()}},
+            upsert=True,
+        )
+
+    checkpoints.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"completed_at": datetime.now()}},
+        upsert=True,
+    )
+    return stats
+
+
+# Runs the date migration over every target collection
+def migrate_all(batch_size: int = 1000, restart: bool = False) -> dict:
+    return {
+        f"{database_name}.{collection_name}": migrate_collection(database_name, collection_name, batch_size, restart)
+        for database_name, collection_name in MIGRATION_TARGETS
+    }
@@ -0,0 +1,66 @@
+from types import MappingProxyType
+from typing import Dict, Mapping, Sequence
+
+import joblib
+import numpy as np
+
+# Below this many values a dict lookup per value beats the vectorised searchsorted path
+SEARCHSORTED_MIN_SIZE = 64
+
+
+# Immutable label -> code lookup compiled from a fitted LabelEncoder; never mutated on the request path
+class CategoryTable:
+    __slots__ = ("column", "strip", "unknown_code", "_codes", "_sorted_labels", "_sorted_codes")
+
+    def __init__(self, column: str, classes: Sequence, strip: bool = False):
+        labels = [str(c) for c in classes]
+        codes = {label: code for code, label in enumerate(labels)}
+        self.column = column
+        self.strip = strip
+        # Unseen labels get the "Unknown" class if the encoder has one, otherwise the next free code,
+        # which is what appending "Unknown" to classes_ used to produce
+        self.unknown_code = codes.get("Unknown", len(labels))
+        self._codes = MappingProxyType(codes)
+
+        order = np.argsort(np.array(labels, dtype=str), kind="stable")
+        self._sorted_labels = np.array(labels, dtype=str)[order]
+        self._sorted_codes = np.arange(len(labels), dtype=np.int64)[order]
+        self._sorted_labels.setflags(write=False)
+        self._sorted_codes.setflags(write=False)
+
+    @classmethod
+    def from_encoder_file(cls, column: str, path: str, strip: bool = False) -> "CategoryTable":
+        encoder = joblib.load(path)
+        return cls(column, getattr(encoder, "classes_", []), strip)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    # Encodes an array of labels to integer codes in one call
+    def encode(self, values: Sequence) -> np.ndarray:
+        n = len(values)
+        if self.strip:
+            values = [str(v).strip() for v in values]
+        if n < SEARCHSORTED_MIN_SIZE or len(self._sorted_labels) == 0:
+            get = self._codes.get
+            unknown = self.unknown_code
+            return np.fromiter((get(str(v), unknown) for v in values), dtype=np.int64, count=n)
+
+        labels = np.asarray(values, dtype=str)
+        pos = np.searchsorted(self._sorted_labels, labels)
+        pos = np.minimum(pos, len(self._sorted_labels) - 1)
+        found = self._sorted_labels[pos] == labels
+        return np.where(found, self._sorted_codes[pos], self.unknown_code)
+
+
+# Compiles every encoder pickle into a lookup table, keyed by column name
+def load_tables(encoder_paths: Dict[str, str], strip: bool = False) -> Mapping[str, CategoryTable]:
+    return MappingProxyType({
+        col: CategoryTable.from_encoder_file(col, path, strip)
+        for col, path in encoder_paths.items()
+    })
+
+
+# Builds lookup tables from stored encoder classes (as published in the model registry), keyed by column name
+def tables_from_classes(classes: Dict[str, Sequence], strip: bool = False) -> Mapping[str, CategoryTable]:
+    return MappingProxyType({col: CategoryTable(col, values, strip) for col, values in classes.items()})
@@ -0,0 +1,100 @@
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.models.service_request_model import parse_request_datetime
+
+CATEGORICAL_COLS = ["MainCategory", "SubCategory", "Building", "Site"]
+
+# Numeric features every model draws from; each model takes its own column slice of these plus encoded categoricals
+NUMERIC_COLS = [
+    "Hour", "Weekday", "Month", "DayOfMonth", "Is weekend",
+    "RequestLength", "IsUrgent", "Hour_Weekday",
+]
+
+URGENT_PATTERN = re.compile("דחוף|מיידי|אסון|תקלה|קריטי|urgent|critical", re.IGNORECASE)
+
+
+# Buckets an hour of day into the TimeOfDay label the duration model was trained on
+def time_of_day(hour: int) -> str:
+    if 6 <= hour < 12:
+        return "Morning"
+    if 12 <= hour < 18:
+        return "Afternoon"
+    return "Evening"
+
+
+# Raw per-request features computed once per request (or batch) and shared by every model
+class FeatureSet:
+    def __init__(self, records: Sequence[dict]):
+        self.n = len(records)
+        now = datetime.now()
+
+        created = []
+        for record in records:
+            value = parse_request_datetime(record.get("Created on"))
+            created.append(value if value is not None else now)
+
+        descriptions = [record.get("Description") for record in records]
+        hour = np.fromiter((d.hour for d in created), dtype=np.int64, count=self.n)
+        weekday = np.fromiter((d.weekday() for d in created), dtype=np.int64, count=self.n)
+
+        self.numeric: Dict[str, np.ndarray] = {
+            "Hour": hour,
+            "Weekday": weekday,
+            "Month": np.fromiter((d.month for d in created), dtype=np.int64, count=self.n),
+            "DayOfMonth": np.fromiter((d.day for d in created), dtype=np.int64, count=self.n),
+            "Is weekend": (weekday >= 5).astype(np.int64),
+            "RequestLength": np.fromiter(
+                (len(d) if isinstance(d, str) else (0 if d is None else len(str(d))) for d in descriptions),
+                dtype=np.int64, count=self.n,
+            ),
+            "IsUrgent": np.fromiter(
+                (1 if isinstance(d, str) and URGENT_PATTERN.search(d) else 0 for d in descriptions),
+                dtype=np.int64, count=self.n,
+            ),
+            "Hour_Weekday": hour * weekday,
+        }
+
+        self.categorical: Dict[str, np.ndarray] = {
+            col: np.array(
+                ["Unknown" if record.get(col) is None else str(record.get(col)) for record in records],
+                dtype=object,
+            )
+            for col in CATEGORICAL_COLS
+        }
+        self.categorical["TimeOfDay"] = np.array([time_of_day(h) for h in hour.tolist()], dtype=object)
+
+        self._encoded: Dict[Tuple[str, str], np.ndarray] = {}
+        self._encoded_columns: Dict[Tuple[str, str], List[str]] = {}
+
+    # Builds (once per encoder set) the full float matrix: encoded categoricals followed by all numeric features.
+    # Matrices are cached per namespace and model version, since a retrained version may refit its encoders.
+    def encoded_matrix(self, namespace: str, version: str,
+                       encoders: Dict[str, Callable[[np.ndarray], np.ndarray]]) -> np.ndarray:
+        key = (namespace, version)
+        if key not in self._encoded:
+            columns = list(encoders) + NUMERIC_COLS
+            matrix = np.empty((self.n, len(columns)), dtype=np.float64)
+            for i, col in enumerate(encoders):
+                matrix[:, i] = encoders[col](self.categorical[col])
+            for i, col in enumerate(NUMERIC_COLS, start=len(encoders)):
+                matrix[:, i] = self.numeric[col]
+            # Columns first: a concurrent reader that sees the matrix must also find its columns
+            self._encoded_columns[key] = columns
+            self._encoded[key] = matrix
+        return self._encoded[key]
+
+    # Returns the rows x columns feature matrix for one model, encoding categoricals with the given encoder set
+    def matrix(self, namespace: str, version: str, columns: Sequence[str],
+               encoders: Dict[str, Callable[[np.ndarray], np.ndarray]]) -> np.ndarray:
+        full = self.encoded_matrix(namespace, version, encoders)
+        index = self._encoded_columns[(namespace, version)]
+        return full[:, [index.index(col) for col in columns]]
+
+
+# Computes the shared feature set for a batch of request payloads
+def build_features(records: Sequence[dict]) -> FeatureSet:
+    return FeatureSet(records)
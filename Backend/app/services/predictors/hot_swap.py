@@ -0,0 +1,186 @@
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+from app.services.predictors.features import build_features
+from app.services.predictors.model_registry import current_version
+from app.services.predictors.prediction_cache import DURATION_CACHE, OVERDUE_CACHE, PredictionCache, artifact_fingerprint
+
+load_dotenv()
+# How often to look for a new model version; 0 disables the watcher
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+# Reject a candidate whose overdue probabilities move further than this from the served models ("0" = no limit)
+MODEL_SWAP_MAX_PROB_DRIFT = float(os.getenv("MODEL_SWAP_MAX_PROB_DRIFT") or "0.3")
+
+# Requests every candidate version must score sensibly before it is served
+VALIDATION_REQUESTS = [
+    {"MainCategory": "A. Cleaning", "SubCategory": "Cleaning needed in Office", "Building": "A1", "Site": "A",
+     "Description": "Validation request", "Created on": "03/05/2024 14:30"},
+    {"MainCategory": "B. Maintenance", "SubCategory": "Air conditioning", "Building": "B2", "Site": "B",
+     "Description": "Urgent: no cooling on the third floor", "Created on": "07/14/2024 09:05"},
+    {"MainCategory": "Unknown", "SubCategory": "Unknown", "Building": "Unknown", "Site": "C",
+     "Description": "", "Created on": "12/31/2024 23:59"},
+    {"MainCategory": None, "SubCategory": None, "Building": None, "Site": None,
+     "Description": None, "Created on": None},
+]
+# Disabled cache the validation scores through, leaving the served prediction cache alone
+NO_CACHE = PredictionCache(maxsize=0)
+
+
+# What the served models were loaded from: the registry's current version, or the legacy pickles' size/mtime
+def source_signature() -> Tuple[Optional[str], str]:
+    version = current_version()
+    if version is not None:
+        return version, ""
+    legacy = (
+        list(overdue.MODEL_PATHS.values()) + list(overdue.ENCODER_PATHS.values())
+        + [duration.MODEL_PATH] + list(duration.ENCODER_PATHS.values())
+    )
+    return None, artifact_fingerprint(legacy)
+
+
+# Scores the validation requests with a candidate model set; raises if any output is unusable.
+# Every member is called directly: the ensemble path swallows member errors and falls back to 0.5, which would
+# let a candidate whose models all fail look valid, and its caches could answer for the served models.
+def validate_candidate(candidate_overdue, candidate_duration) -> Dict[str, Any]:
+    current = overdue.get_models()
+    missing = [name for name in current.models if name not in candidate_overdue.models]
+    if missing:
+        raise ValueError(f"candidate is missing models served now: {missing}")
+    if sum(candidate_overdue.weights.get(name, 0.0) for name in candidate_overdue.models) <= 0.0:
+        raise ValueError("candidate ensemble has no member with a positive weight")
+
+    features = build_features(VALIDATION_REQUESTS)
+    for name in candidate_overdue.models:
+        try:
+            scores = overdue.score_member(candidate_overdue, name, features)
+        except Exception as e:
+            raise ValueError(f"candidate model {name} failed to score: {e}") from e
+        if len(scores) != len(VALIDATION_REQUESTS) or not all(0.0 <= p <= 1.0 for p in scores):
+            raise ValueError(f"candidate model {name} returned unusable probabilities: {list(scores)}")
+
+    X = features.matrix("duration", candidate_duration.version, candidate_duration.features,
+                        candidate_duration.encoder_funcs)
+    try:
+        hours = [float(h) for h in np.ravel(candidate_duration.model.predict(X))]
+    except Exception as e:
+        raise ValueError(f"candidate duration model failed to score: {e}") from e
+    if len(hours) != len(VALIDATION_REQUESTS) or not all(math.isfinite(h) for h in hours):
+        raise ValueError(f"duration predictions are not finite: {hours}")
+
+    # Each model set encodes the requests with its own encoders; neither reads or fills the served cache
+    probs = overdue.predict_combined_risk_batch(VALIDATION_REQUESTS, features, candidate_overdue, cache=NO_CACHE)
+    served = overdue.predict_combined_risk_batch(VALIDATION_REQUESTS, features, current, cache=NO_CACHE)
+    drift = max(abs(a - b) for a, b in zip(probs, served))
+    if MODEL_SWAP_MAX_PROB_DRIFT > 0 and drift > MODEL_SWAP_MAX_PROB_DRIFT:
+        raise ValueError(f"overdue probability drift {drift:.3f} exceeds {MODEL_SWAP_MAX_PROB_DRIFT}")
+    return {"max_prob_drift": round(drift, 4)}
+
+
+# Watches for a new model version and swaps it in once it has loaded, validated and warmed up in the background
+class ModelWatcher:
+    def __init__(self, interval: float = MODEL_WATCH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._served = None
+        self._pending = None
+        self.swaps = 0
+        self.last_swap: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    # Records the signature of the files the served models come from, so only later changes trigger a reload
+    def _baseline(self):
+        if self._served is None:
+            self._served = source_signature()
+
+    # Loads and validates the candidate, then swaps both predictors over; the served models are untouched on failure
+    def reload(self, signature) -> bool:
+        start = time.perf_counter()
+        try:
+            candidate_overdue = overdue.load_models()
+            candidate_duration = duration.load_model()
+            if "registry" in candidate_overdue.errors:
+                raise ValueError(candidate_overdue.errors["registry"])
+            checks = validate_candidate(candidate_overdue, candidate_duration)
+        except Exception as e:
+            self.last_error = f"{signature[0] or 'legacy'}: {e}"
+            print(f"Model reload rejected, keeping the served models: {e}")
+            return False
+
+        overdue.swap_models(candidate_overdue)
+        duration.swap_model(candidate_duration)
+        # Entries of the old version can no longer match (the version is part of the key); drop them now
+        OVERDUE_CACHE.clear()
+        DURATION_CACHE.clear()
+
+        self._served = signature
+        self.swaps += 1
+        self.last_error = None
+        self.last_swap = {
+            "version": candidate_overdue.registry_version or "legacy",
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "load_ms": round((time.perf_counter() - start) * 1000, 1),
+            **checks,
+        }
+        print(f"Swapped to model version {self.last_swap['version']}")
+        return True
+
+    # Compares the source signature with the served one; a change must be seen twice in a row (files fully written)
+    def check_once(self) -> bool:
+        self._baseline()
+        signature = source_signature()
+        if signature == self._served:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending = signature
+            return False
+        self._pending = None
+        return self.reload(signature)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Model watcher error: {e}")
+
+    # Starts the watcher thread once per process
+    def start(self) -> bool:
+        if self.interval <= 0:
+            return False
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return False
+            self._pid = os.getpid()
+            self._baseline()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "swaps": self.swaps,
+            "last_swap": self.last_swap,
+            "last_error": self.last_error,
+        }
+
+
+MODEL_WATCHER = ModelWatcher()
+
+
+# Starts watching for new model versions in this process
+def start_watcher() -> bool:
+    return MODEL_WATCHER.start()
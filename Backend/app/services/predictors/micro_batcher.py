@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Off by default: batching only pays off when many requests score concurrently
+MICRO_BATCH_ENABLED = os.getenv("PREDICT_MICRO_BATCH", "0") == "1"
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "2"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+# Above this many queued requests callers score inline instead of waiting
+MICRO_BATCH_MAX_QUEUE = int(os.getenv("MICRO_BATCH_MAX_QUEUE", "1024"))
+# A caller whose batch has not completed after this long scores inline
+MICRO_BATCH_TIMEOUT_SECONDS = float(os.getenv("MICRO_BATCH_TIMEOUT_SECONDS", "5"))
+
+
+# One caller's request waiting for its batch
+class _Pending:
+    __slots__ = ("record", "event", "result", "error", "enqueued_at")
+
+    def __init__(self, record: dict):
+        self.record = record
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.enqueued_at = time.perf_counter()
+
+
+# Collects concurrent single-record calls for up to max_wait_ms or max_batch items, scores them with one
+# vectorised call and hands each caller its own result
+class MicroBatcher:
+    def __init__(self, name: str, predict_batch: Callable[[List[dict]], List[Any]],
+                 max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS, max_batch: int = MICRO_BATCH_MAX_SIZE,
+                 max_queue: int = MICRO_BATCH_MAX_QUEUE):
+        self.name = name
+        self.predict_batch = predict_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+        self.inline = 0
+        self.wait_ms_total = 0.0
+        self.predict_ms_total = 0.0
+
+    # Starts the worker thread on first use in each process (threads do not survive a fork)
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._queue.clear()
+        self._thread = threading.Thread(target=self._run, name=f"micro-batch-{self.name}", daemon=True)
+        self._thread.start()
+
+    # Scores one record through the shared batch, or inline when the queue is saturated
+    def submit(self, record: dict) -> Any:
+        pending = _Pending(record)
+        with self._cond:
+            self._ensure_worker()
+            if len(self._queue) >= self.max_queue:
+                self.inline += 1
+                pending = None
+            else:
+                self._queue.append(pending)
+                self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+                self._cond.notify()
+        if pending is not None and not pending.event.wait(MICRO_BATCH_TIMEOUT_SECONDS):
+            with self._cond:
+                if not pending.event.is_set():
+                    # Withdrawn so a later batch does not score it again; a batch already in flight keeps it
+                    if pending in self._queue:
+                        self._queue.remove(pending)
+                    self.inline += 1
+                    pending = None
+        if pending is None:
+            return self.predict_batch([record])[0]
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    # Waits for the first request, then keeps collecting until the batch is full or the oldest request's wait expires
+    def _take_batch(self) -> List[_Pending]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            size = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            start = time.perf_counter()
+            try:
+                results = self.predict_batch([pending.record for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finished = time.perf_counter()
+
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.predict_ms_total += (finished - start) * 1000
+            self.wait_ms_total += sum((start - pending.enqueued_at) * 1000 for pending in batch)
+            for pending in batch:
+                pending.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch": self.max_batch,
+            "max_queue": self.max_queue,
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(self.wait_ms_total / self.items, 3) if self.items else 0.0,
+            "avg_predict_ms": round(self.predict_ms_total / self.batches, 3) if self.batches else 0.0,
+            "inline": self.inline,
+        }
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR") or os.path.join(APP_DIR, "ml_models", "registry")
+# File in REGISTRY_DIR naming the active version; MODEL_REGISTRY_VERSION pins a version instead
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+VERIFY_CHECKSUMS = os.getenv("MODEL_REGISTRY_VERIFY", "1") == "1"
+
+
+# Hex sha256 of a file, read in chunks
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Name of the version the predictors should serve, or None if the registry has none
+def current_version() -> Optional[str]:
+    pinned = os.getenv("MODEL_REGISTRY_VERSION")
+    if pinned:
+        return pinned
+    try:
+        with open(os.path.join(REGISTRY_DIR, CURRENT_FILE), "r", encoding="utf-8") as file:
+            return file.read().strip() or None
+    except OSError:
+        return None
+
+
+# A published model version: its manifest plus helpers to load and verify the files it lists
+class ModelManifest:
+    def __init__(self, version: str, data: Dict[str, Any]):
+        self.version = version
+        self.data = data
+        self.directory = os.path.join(REGISTRY_DIR, version)
+
+    @classmethod
+    def load(cls, version: str) -> "ModelManifest":
+        with open(os.path.join(REGISTRY_DIR, version, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            return cls(version, json.load(file))
+
+    def path(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, entry["file"])
+
+    def section(self, name: str) -> Dict[str, Any]:
+        return self.data[name]
+
+    # Checks every listed file against its recorded sha256; returns the mismatches
+    def verify(self) -> List[str]:
+        problems = []
+        unique = {entry["file"]: entry for entry in self.entries()}
+        for entry in unique.values():
+            path = self.path(entry)
+            if not os.path.exists(path):
+                problems.append(f"{entry['file']}: missing")
+            elif sha256_file(path) != entry["sha256"]:
+                problems.append(f"{entry['file']}: checksum mismatch")
+        return problems
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for section in ("overdue", "duration"):
+            if section not in self.data:
+                continue
+            entries.extend(self.data[section].get("models", {}).values())
+            entries.extend(self.data[section].get("encoders", {}).values())
+        return entries
+
+
+# Returns the manifest of the given (or current) version after verifying it, or None to fall back to legacy paths
+def load_manifest(version: Optional[str] = None) -> Optional[ModelManifest]:
+    version = version or current_version()
+    if version is None:
+        return None
+    manifest = ModelManifest.load(version)
+    if VERIFY_CHECKSUMS:
+        problems = manifest.verify()
+        if problems:
+            raise ValueError(f"model version {version} failed verification: {problems}")
+    return manifest
+
+
+# Loads a model file; only plain numpy arrays stored in it are memory-mapped. XGBoost, LightGBM and CatBoost
+# boosters are native buffers copied into each loading process: workers share them only by inheriting them
+# copy-on-write from a preloading master (wsgi.py).
+def load_model_file(path: str) -> Any:
+    return joblib.load(path, mmap_mode="r")
+
+
+# Loads encoder classes stored as a .npy array, memory-mapped
+def load_encoder_classes(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+# Writes a file into the version directory under a content-addressed name, so identical artifacts are stored once
+def _store(version_dir: str, subdir: str, stem: str, suffix: str, write) -> Dict[str, Any]:
+    tmp_path = os.path.join(version_dir, f".{stem}.tmp{suffix}")
+    write(tmp_path)
+    checksum = sha256_file(tmp_path)
+    relative = os.path.join(subdir, f"{stem}-{checksum[:12]}{suffix}")
+    os.makedirs(os.path.join(version_dir, subdir), exist_ok=True)
+    os.replace(tmp_path, os.path.join(version_dir, relative))
+    return {"file": relative, "sha256": checksum}
+
+
+# Publishes a new version from fitted estimators and label encoder classes; returns the manifest data
+def publish_version(version: str, overdue_models: Dict[str, Dict[str, Any]], overdue_encoders: Dict[str, Sequence],
+                    duration_model: Dict[str, Any], duration_encoders: Dict[str, Sequence],
+                    activate: bool = True) -> Dict[str, Any]:
+    version_dir = os.path.join(REGISTRY_DIR, version)
+    if os.path.exists(version_dir):
+        raise FileExistsError(f"model version {version} already exists")
+    staging_dir = version_dir + ".staging"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    def store_model(name: str, estimator) -> Dict[str, Any]:
+        # Uncompressed so joblib can memory-map the arrays on load
+        return _store(staging_dir, "models", name, ".joblib", lambda path: joblib.dump(estimator, path))
+
+    def store_encoder(column: str, classes: Sequence) -> Dict[str, Any]:
+        array = np.asarray([str(c) for c in classes], dtype=str)
+        return _store(staging_dir, "encoders", column, ".npy", lambda path: np.save(path, array))
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "overdue": {
+            "models": {
+                name: {**store_model(name, spec["estimator"]), "features": list(spec["features"]), "weight": spec["weight"]}
+                for name, spec in overdue_models.items()
+            },
+            "encoders": {col: store_encoder(col, classes) for col, classes in overdue_encoders.items()},
+        },
+        "duration": {
+            "models": {
+                "lightgbm_duration": {
+                    **store_model("lightgbm_duration", duration_model["estimator"]),
+                    "features": list(duration_model["features"]),
+                },
+            },
+            "encoders": {col: store_encoder(col, classes) for col, classes in duration_encoders.items()},
+        },
+    }
+    with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(staging_dir, version_dir)
+
+    if activate:
+        activate_version(version)
+    return manifest
+
+
+# Points CURRENT at a published version; the file is replaced atomically
+def activate_version(version: str):
+    if not os.path.exists(os.path.join(REGISTRY_DIR, version, MANIFEST_FILE)):
+        raise FileNotFoundError(f"model version {version} is not published")
+    tmp_path = os.path.join(REGISTRY_DIR, f".{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(version + "\n")
+    os.replace(tmp_path, os.path.join(REGISTRY_DIR, CURRENT_FILE))
+
+
+# Published versions, oldest first
+def list_versions() -> List[str]:
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    versions = [
+        name for name in os.listdir(REGISTRY_DIR)
+        if os.path.exists(os.path.join(REGISTRY_DIR, name, MANIFEST_FILE))
+    ]
+    return sorted(versions)
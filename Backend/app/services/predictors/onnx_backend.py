@@ -0,0 +1,132 @@
+import copy
+import json
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.services.predictors.prediction_cache import artifact_fingerprint
+from app.services.predictors.thread_budget import THREAD_BUDGET
+
+load_dotenv()
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+ONNX_DIR = os.getenv("ONNX_MODEL_DIR") or os.path.join(APP_DIR, "ml_models", "onnx")
+# "native" runs each library's own predict; "onnx" serves exported models through onnxruntime
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "native").strip().lower()
+# Unset follows the per-call thread budget of the other backends
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+# Models served through onnxruntime under the onnx backend; CatBoost's own predict is already faster than its export
+ONNX_MODELS = {m.strip() for m in os.getenv("ONNX_MODELS", "random_forest,xgboost,lightgbm_duration").split(",") if m.strip()}
+
+
+# Whether a model should be served from its ONNX export
+def use_onnx(model_name: str) -> bool:
+    return INFERENCE_BACKEND == "onnx" and model_name in ONNX_MODELS
+
+
+# Paths of a model's exported .onnx file and its metadata file
+def onnx_paths(model_name: str) -> Tuple[str, str]:
+    base = os.path.join(ONNX_DIR, model_name)
+    return base + ".onnx", base + ".json"
+
+
+# Converts a fitted XGBoost, LightGBM, CatBoost or scikit-learn estimator to a serialized ONNX model
+def _to_onnx_bytes(estimator, n_features: int, onnx_path: str) -> Optional[bytes]:
+    module = type(estimator).__module__.split(".")[0]
+    if module == "catboost":
+        estimator.save_model(onnx_path, format="onnx")
+        return None
+
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    initial_types = [("input", FloatTensorType([None, n_features]))]
+    if module == "xgboost":
+        from onnxmltools import convert_xgboost
+        # The converter only understands f0..fN feature names, so export a copy without the training column names
+        estimator = copy.deepcopy(estimator)
+        estimator.get_booster().feature_names = None
+        model = convert_xgboost(estimator, initial_types=initial_types)
+    elif module == "lightgbm":
+        from onnxmltools import convert_lightgbm
+        model = convert_lightgbm(estimator, initial_types=initial_types, zipmap=False)
+    elif module == "sklearn":
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType as SklFloatTensorType
+        model = convert_sklearn(
+            estimator,
+            initial_types=[("input", SklFloatTensorType([None, n_features]))],
+            options={id(estimator): {"zipmap": False}} if hasattr(estimator, "predict_proba") else None,
+        )
+    else:
+        raise TypeError(f"no ONNX converter for {type(estimator).__name__}")
+    return model.SerializeToString()
+
+
+# Exports one model to ONNX next to a metadata file recording which artifact it was built from
+def export_model(model_name: str, estimator, n_features: int, artifact_paths: Sequence[str]) -> dict:
+    onnx_path, meta_path = onnx_paths(model_name)
+    os.makedirs(ONNX_DIR, exist_ok=True)
+    serialized = _to_onnx_bytes(estimator, n_features, onnx_path)
+    if serialized is not None:
+        with open(onnx_path, "wb") as file:
+            file.write(serialized)
+
+    meta = {
+        "model": model_name,
+        "estimator": type(estimator).__name__,
+        "n_features": n_features,
+        "classifier": hasattr(estimator, "predict_proba"),
+        "fingerprint": artifact_fingerprint(artifact_paths),
+    }
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+    return meta
+
+
+# onnxruntime session exposing the predict / predict_proba interface the predictors already call
+class OnnxModel:
+    def __init__(self, path: str, classifier: bool):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = ONNX_INTRA_OP_THREADS or THREAD_BUDGET.per_call
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.classifier = classifier
+        if classifier:
+            self.predict_proba = self._predict_proba
+
+    def _run(self, X) -> list:
+        return self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})
+
+    def _predict_proba(self, X) -> np.ndarray:
+        probabilities = self._run(X)[1]
+        # CatBoost exports probabilities as a sequence of {class: probability} maps
+        if isinstance(probabilities, list):
+            return np.array([[row[0], row[1]] for row in probabilities], dtype=np.float64)
+        return np.asarray(probabilities, dtype=np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        outputs = self._run(X)
+        if self.classifier:
+            return np.asarray(outputs[0])
+        return np.ravel(outputs[0]).astype(np.float64)
+
+
+# Opens a model's ONNX export if it exists and was built from the artifact currently on disk
+def load_onnx_model(model_name: str, artifact_paths: Sequence[str]) -> Optional[OnnxModel]:
+    onnx_path, meta_path = onnx_paths(model_name)
+    if not (os.path.exists(onnx_path) and os.path.exists(meta_path)):
+        print(f"No ONNX export for {model_name}, using the native model")
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("fingerprint") != artifact_fingerprint(artifact_paths):
+            print(f"ONNX export for {model_name} is older than its artifact, using the native model")
+            return None
+        return OnnxModel(onnx_path, bool(meta.get("classifier")))
+    except Exception as e:
+        print(f"Error loading ONNX model {model_name}, using the native model: {e}")
+        return None
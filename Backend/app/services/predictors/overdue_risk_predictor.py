@@ -1,9 +1,18 @@
 import os
+import threading
 import joblib
-import pandas as pd
-from datetime import datetime
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from app.services.predictors.features import FeatureSet, build_features, CATEGORICAL_COLS
+from app.services.predictors.encoding import load_tables, tables_from_classes
+from app.services.predictors.model_registry import ModelManifest, load_encoder_classes, load_manifest, load_model_file
+from app.services.predictors.prediction_cache import OVERDUE_CACHE, PredictionCache, artifact_fingerprint
+from app.services.predictors.score_cube import ScoreCube
+from app.services.predictors.onnx_backend import load_onnx_model, use_onnx
+from app.services.predictors.micro_batcher import MICRO_BATCH_ENABLED, MicroBatcher
+from app.services.predictors.thread_budget import limit_threads
+from app.timing import span
 
 APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -28,8 +37,6 @@ FEATURE_COLUMNS = {
     "catboost": ["MainCategory", "SubCategory", "Building", "Site", "Hour", "Weekday", "Month", "DayOfMonth", "Is weekend", "RequestLength", "IsUrgent"],
 }
 
-CATEGORICAL_COLS = ["MainCategory", "SubCategory", "Building", "Site"]
-
 # Checks if an object has prediction capabilities (predict or predict_proba methods)
 def _has_predict_like(o: Any) -> bool:
     return hasattr(o, "predict") or hasattr(o, "predict_proba")
@@ -46,79 +53,208 @@ def _unwrap_estimator(artifact: Any) -> Any:
                 return artifact[key]
     return artifact
 
-LOADED_MODELS: Dict[str, Any] = {}
+# Label encoder pickles, one per categorical column
+ENCODER_PATHS = {col: os.path.join(ENCODER_DIR, f"{col}_encoder.pkl") for col in CATEGORICAL_COLS}
+
+# Models whose whole input space is precomputed into a score cube (see build_score_cube.py)
+CUBE_MODELS = [m.strip() for m in os.getenv("OVERDUE_SCORE_CUBES", "random_forest").split(",") if m.strip()]
+
+# Everything the ensemble needs, loaded together off the request path from a registry version
+# (or from the legacy ml_models paths when no version is published)
+class OverdueModels:
+    def __init__(self, manifest: Optional[ModelManifest] = None):
+        if manifest is None:
+            self.registry_version = None
+            self.model_paths = dict(MODEL_PATHS)
+            self.features = dict(FEATURE_COLUMNS)
+            self.weights = dict(MODEL_WEIGHTS)
+            self.encoder_paths = dict(ENCODER_PATHS)
+            load_model = joblib.load
+            # Label encoders compiled once into immutable lookup tables; unseen labels map to a fixed unknown code
+            self.encoder_tables = load_tables(self.encoder_paths)
+        else:
+            section = manifest.section("overdue")
+            self.registry_version = manifest.version
+            self.model_paths = {name: manifest.path(entry) for name, entry in section["models"].items()}
+            self.features = {name: entry["features"] for name, entry in section["models"].items()}
+            self.weights = {name: entry["weight"] for name, entry in section["models"].items()}
+            self.encoder_paths = {col: manifest.path(entry) for col, entry in section["encoders"].items()}
+            load_model = load_model_file
+            self.encoder_tables = tables_from_classes(
+                {col: load_encoder_classes(path) for col, path in self.encoder_paths.items()}
+            )
+        self.encoder_funcs = {col: table.encode for col, table in self.encoder_tables.items()}
+
+        self.native: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        for name, path in self.model_paths.items():
+            try:
+                art = load_model(path)
+                est = _unwrap_estimator(art)
+                if not _has_predict_like(est):
+                    raise TypeError("artifact has no usable estimator")
+                self.native[name] = est
+            except Exception as e:
+                self.errors[name] = str(e)
+
+        if not self.native:
+            raise RuntimeError(f"No overdue models loaded. Errors: {self.errors}")
+
+        # Each served model runs with the per-call thread budget, so concurrent calls do not oversubscribe the cores.
+        # With INFERENCE_BACKEND=onnx, models listed in ONNX_MODELS that have an up-to-date export are served by onnxruntime
+        self.models: Dict[str, Any] = {name: limit_threads(est) for name, est in self.native.items()}
+        for name in self.native:
+            if use_onnx(name):
+                onnx_model = load_onnx_model(name, [self.model_paths[name]])
+                if onnx_model is not None:
+                    self.models[name] = onnx_model
+
+        # Identifies the loaded models and encoders; part of every cache key so results from other artifacts never match
+        self.version = artifact_fingerprint(
+            [self.model_paths[name] for name in self.models] + list(self.encoder_paths.values())
+        )
+
+        self.cubes: Dict[str, ScoreCube] = {}
+        for name in CUBE_MODELS:
+            if name in self.models:
+                cube = ScoreCube.load(name, self.features[name], self.encoder_tables, self.artifact_paths(name))
+                if cube is not None:
+                    self.cubes[name] = cube
+
+    # Artifacts a model's scores depend on; a cube or ONNX export built from different files is not used
+    def artifact_paths(self, model_name: str) -> List[str]:
+        return [self.model_paths[model_name]] + list(self.encoder_paths.values())
+
+# Per-model load failures of the current models (e.g. a missing pickle); filled once loading has run
 LOAD_ERRORS: Dict[str, str] = {}
-for name, path in MODEL_PATHS.items():
+
+_MODELS: Optional[OverdueModels] = None
+_LOAD_LOCK = threading.Lock()
+
+# Loads the current registry version, falling back to the legacy paths if the registry is empty or unusable
+def load_models() -> OverdueModels:
     try:
-        art = joblib.load(path)
-        est = _unwrap_estimator(art)
-        if not _has_predict_like(est):
-            raise TypeError("artifact has no usable estimator")
-        LOADED_MODELS[name] = est
+        manifest = load_manifest()
     except Exception as e:
-        LOAD_ERRORS[name] = str(e)
+        print(f"Error reading the model registry, using legacy model paths: {e}")
+        models = OverdueModels()
+        models.errors["registry"] = str(e)
+        return models
+    return OverdueModels(manifest)
+
+# Returns the loaded models, loading them first if the startup warm-up has not finished yet
+def get_models() -> OverdueModels:
+    global _MODELS
+    if _MODELS is None:
+        with _LOAD_LOCK:
+            if _MODELS is None:
+                _set_models(load_models())
+    return _MODELS
+
+# Publishes a loaded model set; a single reference assignment, so each request sees either the old or the new set
+def _set_models(models: OverdueModels):
+    global _MODELS, LOAD_ERRORS
+    LOAD_ERRORS = dict(models.errors)
+    _MODELS = models
 
-if not LOADED_MODELS:
-    raise RuntimeError(f"No overdue models loaded. Errors: {LOAD_ERRORS}")
+# Replaces the served models with an already loaded and validated set
+def swap_models(models: OverdueModels):
+    with _LOAD_LOCK:
+        _set_models(models)
 
-ENCODERS: Dict[str, Any] = {}
-# Loads and caches label encoders for categorical feature transformation
-def get_encoder(col: str):
-    if col not in ENCODERS:
-        ENCODERS[col] = joblib.load(os.path.join(ENCODER_DIR, f"{col}_encoder.pkl"))
-    return ENCODERS[col]
+# Whether the models have been loaded in this process
+def is_loaded() -> bool:
+    return _MODELS is not None
+
+# Builds the feature matrix for the given model from a batch of records (or an already built feature set)
+def preprocess_records(records: List[dict], model_name: str, features: Optional[FeatureSet] = None) -> np.ndarray:
+    if features is None:
+        features = build_features(records)
+    models = get_models()
+    return features.matrix("overdue", models.version, models.features[model_name], models.encoder_funcs)
 
 # Preprocesses input data for machine learning models including feature engineering and encoding
-def preprocess_input(data: dict, model_name: str) -> pd.DataFrame:
-    df = pd.DataFrame([data])
-
-    if "Created on" not in df or pd.isna(df.loc[0, "Created on"]):
-        df["Created on"] = datetime.now()
-    df["Created on"] = pd.to_datetime(df["Created on"], errors="coerce").fillna(datetime.now())
-
-    df["Hour"] = df["Created on"].dt.hour
-    df["Weekday"] = df["Created on"].dt.weekday
-    df["Month"] = df["Created on"].dt.month
-    df["DayOfMonth"] = df["Created on"].dt.day
-    df["Is weekend"] = df["Weekday"].isin([5, 6]).astype(int)
-    df["RequestLength"] = df["Description"].apply(lambda x: len(str(x)))
-    df["IsUrgent"] = df["Description"].str.contains("(?i)דחוף|מיידי|אסון|תקלה|קריטי|urgent|critical", na=False).astype(int)
-
-    for col in CATEGORICAL_COLS:
-        le = get_encoder(col)
-        df[col] = df[col].fillna("Unknown").astype(str)
-        if "Unknown" not in getattr(le, "classes_", []):
-            le.classes_ = np.append(le.classes_, "Unknown")
-        df[col] = df[col].apply(lambda v: v if v in le.classes_ else "Unknown")
-        df[col] = le.transform(df[col])
-
-    feats = FEATURE_COLUMNS[model_name]
-    X = df.reindex(columns=feats, fill_value=0)
-    return X
+def preprocess_input(data: dict, model_name: str) -> np.ndarray:
+    return preprocess_records([data], model_name)
 
-# Extracts prediction score from a model using either predict_proba or predict methods
-def _model_score(model, X) -> float:
+# Extracts prediction scores for every row from a model using either predict_proba or predict methods
+def _model_scores(model, X) -> np.ndarray:
     if hasattr(model, "predict_proba"):
         proba = model.predict_proba(X)
-        return float(np.ravel(proba[:, 1])[0])
+        return np.asarray(proba)[:, 1].astype(float)
     pred = model.predict(X)
-    return float(np.ravel(pred)[0])
+    return np.ravel(pred).astype(float)
+
+# Extracts prediction score from a model using either predict_proba or predict methods
+def _model_score(model, X) -> float:
+    return float(_model_scores(model, X)[0])
+
+# Scores rows of a feature set (all of them by default) with one ensemble member; raises if the model fails
+def score_member(models: OverdueModels, name: str, features: FeatureSet, rows: Optional[List[int]] = None) -> np.ndarray:
+    model = models.models[name]
+    X = features.matrix("overdue", models.version, models.features[name], models.encoder_funcs)
+    if rows is not None:
+        X = X[rows]
+    with span(f"model_{name}"):
+        if name in models.cubes:
+            return models.cubes[name].predict(X, lambda batch: _model_scores(model, batch))
+        return _model_scores(model, X)
 
 # Combines predictions from multiple ML models using weighted ensemble to predict overdue risk
 def predict_combined_risk(data: dict) -> float:
-    total_w = 0.0
-    weighted = 0.0
+    if MICRO_BATCH_ENABLED:
+        return OVERDUE_BATCHER.submit(data)
+    return predict_combined_risk_batch([data])[0]
 
-    for name, model in LOADED_MODELS.items():
+# Scores a batch of requests with the weighted ensemble, running each model once on the rows not already cached.
+# The model set is read once, so a concurrent swap never mixes versions within a call. With an executor the
+# ensemble members run concurrently on it; the caller must not itself be one of the executor's tasks.
+def predict_combined_risk_batch(records: List[dict], features: Optional[FeatureSet] = None,
+                                models: Optional[OverdueModels] = None, executor=None,
+                                cache: PredictionCache = OVERDUE_CACHE) -> List[float]:
+    models = models or get_models()
+    if features is None:
+        features = build_features(records)
+
+    keys = cache.keys_for(features.encoded_matrix("overdue", models.version, models.encoder_funcs), models.version)
+    scores = cache.get_many(keys)
+    missing = [i for i, s in enumerate(scores) if s is None]
+    if not missing:
+        return scores
+
+    # One ensemble member's scores for the missing rows, or None if the model fails
+    def member_scores(name: str, model) -> Optional[np.ndarray]:
         try:
-            X = preprocess_input(data, name)
-            s = _model_score(model, X)
-            w = MODEL_WEIGHTS.get(name, 0.0)
-            weighted += s * w
-            total_w += w
+            return score_member(models, name, features, missing)
         except Exception:
+            return None
+
+    if executor is None:
+        members = [(name, member_scores(name, model)) for name, model in models.models.items()]
+    else:
+        futures = [(name, executor.submit(member_scores, name, model)) for name, model in models.models.items()]
+        members = [(name, future.result()) for name, future in futures]
+
+    total_w = 0.0
+    weighted = np.zeros(len(missing), dtype=float)
+    for name, s in members:
+        if s is None:
             continue
+        w = models.weights.get(name, 0.0)
+        weighted += s * w
+        total_w += w
 
     if total_w == 0.0:
-        return 0.5
-    return float(round(weighted / total_w, 2))
+        # Fallback scores are not cached so the next call retries the models
+        for i in missing:
+            scores[i] = 0.5
+        return scores
+
+    computed = [float(round(v, 2)) for v in weighted / total_w]
+    cache.put_many([keys[i] for i in missing], computed)
+    for i, value in zip(missing, computed):
+        scores[i] = value
+    return scores
+
+# Concurrent single-request calls share one ensemble run when PREDICT_MICRO_BATCH=1
+OVERDUE_BATCHER = MicroBatcher("overdue", predict_combined_risk_batch)
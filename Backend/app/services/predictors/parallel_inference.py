@@ -0,0 +1,40 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Off by default: create_ticket runs the models one after another on the request thread
+PARALLEL_INFERENCE_ENABLED = os.getenv("PARALLEL_INFERENCE", "0") == "1"
+# Shared by all requests of a worker process, so concurrent tickets cannot run more model calls than this at once
+PARALLEL_INFERENCE_WORKERS = int(os.getenv("PARALLEL_INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+# Bounded thread pool for model calls and the ticket insert; tree models spend most of their time in native
+# code that releases the GIL, so independent calls overlap
+class InferencePool:
+    def __init__(self, workers: int = PARALLEL_INFERENCE_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    # Creates the executor on first use in each process (worker threads do not survive a fork)
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            return self._executor
+
+    # Runs fn in a copy of the caller's context, so its timing spans count towards the caller's request.
+    # Tasks must not wait on other tasks of this pool, or a full pool deadlocks.
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        return self._ensure_executor().submit(context.run, fn, *args, **kwargs)
+
+
+INFERENCE_POOL = InferencePool()
@@ -1,9 +1,17 @@
 import os
+import threading
 import joblib
-import pandas as pd
 import numpy as np
-from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from app.services.predictors.features import FeatureSet, build_features
+from app.services.predictors.encoding import load_tables, tables_from_classes
+from app.services.predictors.model_registry import ModelManifest, load_encoder_classes, load_manifest, load_model_file
+from app.services.predictors.prediction_cache import DURATION_CACHE, artifact_fingerprint
+from app.services.predictors.onnx_backend import load_onnx_model, use_onnx
+from app.services.predictors.micro_batcher import MICRO_BATCH_ENABLED, MicroBatcher
+from app.services.predictors.thread_budget import limit_threads
+from app.timing import span
 
 APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -37,62 +45,109 @@ def _unwrap_estimator(artifact: Any) -> Any:
                 return artifact[key]
     return artifact
 
-art = joblib.load(MODEL_PATH)
-MODEL = _unwrap_estimator(art)
-
-ENCODERS: Dict[str, Any] = {}
-# Loads and caches label encoders for categorical feature transformation in duration prediction
-def get_encoder(col: str):
-    if col not in ENCODERS:
-        ENCODERS[col] = joblib.load(ENCODER_PATHS[col])
-    return ENCODERS[col]
-
-# Safely transforms categorical data using label encoders with unknown value handling
-def _safe_transform(col: str, series: pd.Series) -> pd.Series:
-    enc = get_encoder(col)
-    classes = set(getattr(enc, "classes_", []))
-    s = series.astype(str).fillna("Unknown").str.strip()
-    unknown_mask = ~s.isin(classes) if classes else pd.Series(False, index=s.index)
-    if unknown_mask.any() and "Unknown" not in classes:
-        enc.classes_ = np.append(getattr(enc, "classes_", np.array([], dtype=object)), "Unknown")
-        s = s.where(~unknown_mask, "Unknown")
-    elif unknown_mask.any():
-        s = s.where(~unknown_mask, "Unknown")
-    return enc.transform(s)
+# The duration model and its encoders, loaded together off the request path from a registry version
+# (or from the legacy ml_models paths when no version is published)
+class DurationModel:
+    def __init__(self, manifest: Optional[ModelManifest] = None):
+        if manifest is None:
+            self.registry_version = None
+            self.model_path = MODEL_PATH
+            self.features = list(FEATURE_COLUMNS)
+            self.encoder_paths = dict(ENCODER_PATHS)
+            self.native = _unwrap_estimator(joblib.load(self.model_path))
+            # Label encoders compiled once into immutable lookup tables; labels are whitespace-stripped before lookup
+            self.encoder_tables = load_tables(self.encoder_paths, strip=True)
+        else:
+            section = manifest.section("duration")
+            entry = section["models"]["lightgbm_duration"]
+            self.registry_version = manifest.version
+            self.model_path = manifest.path(entry)
+            self.features = list(entry["features"])
+            self.encoder_paths = {col: manifest.path(e) for col, e in section["encoders"].items()}
+            self.native = _unwrap_estimator(load_model_file(self.model_path))
+            self.encoder_tables = tables_from_classes(
+                {col: load_encoder_classes(path) for col, path in self.encoder_paths.items()}, strip=True
+            )
+        self.encoder_funcs = {col: table.encode for col, table in self.encoder_tables.items()}
+
+        # Served with the per-call thread budget, so concurrent calls do not oversubscribe the cores
+        self.model = limit_threads(self.native)
+        # With INFERENCE_BACKEND=onnx the model is served by onnxruntime when an up-to-date export exists
+        if use_onnx("lightgbm_duration"):
+            self.model = load_onnx_model("lightgbm_duration", [self.model_path]) or self.native
+
+        # Identifies the loaded model and encoders; part of every cache key so results from other artifacts never match
+        self.version = artifact_fingerprint([self.model_path] + list(self.encoder_paths.values()))
+
+# Loads the current registry version, falling back to the legacy paths if the registry is empty or unusable
+def load_model() -> DurationModel:
+    try:
+        manifest = load_manifest()
+    except Exception as e:
+        print(f"Error reading the model registry, using legacy model paths: {e}")
+        return DurationModel()
+    return DurationModel(manifest)
+
+_MODEL: Optional[DurationModel] = None
+_LOAD_LOCK = threading.Lock()
+
+# Returns the loaded model, loading it first if the startup warm-up has not finished yet
+def get_model() -> DurationModel:
+    global _MODEL
+    if _MODEL is None:
+        with _LOAD_LOCK:
+            if _MODEL is None:
+                _MODEL = load_model()
+    return _MODEL
+
+# Replaces the served model with an already loaded and validated one; a single reference assignment
+def swap_model(model: DurationModel):
+    global _MODEL
+    with _LOAD_LOCK:
+        _MODEL = model
+
+# Whether the model has been loaded in this process
+def is_loaded() -> bool:
+    return _MODEL is not None
+
+# Builds the duration model's feature matrix from a batch of records (or an already built feature set)
+def preprocess_records(records: List[dict], features: Optional[FeatureSet] = None) -> np.ndarray:
+    if features is None:
+        features = build_features(records)
+    model = get_model()
+    return features.matrix("duration", model.version, model.features, model.encoder_funcs)
 
 # Preprocesses input data for duration prediction including feature engineering and encoding
-def preprocess_input(data: dict) -> pd.DataFrame:
-    df = pd.DataFrame([data])
-
-    if "Created on" not in df or pd.isna(df.loc[0, "Created on"]):
-        df["Created on"] = datetime.now()
-    df["Created on"] = pd.to_datetime(df["Created on"], errors="coerce").fillna(datetime.now())
-
-    df["Hour"] = df["Created on"].dt.hour
-    df["Weekday"] = df["Created on"].dt.weekday
-    df["Month"] = df["Created on"].dt.month
-    df["DayOfMonth"] = df["Created on"].dt.day
-    df["Is weekend"] = df["Weekday"].isin([5, 6]).astype(int)
-
-    desc = df.get("Description", "").fillna("").astype(str)
-    df["RequestLength"] = desc.str.len()
-    df["TimeOfDay"] = df["Hour"].apply(
-        lambda x: "Morning" if 6 <= x < 12 else ("Afternoon" if 12 <= x < 18 else "Evening")
-    )
-
-    for col in ["MainCategory", "SubCategory", "Building", "Site", "TimeOfDay"]:
-        if col not in df:
-            df[col] = "Unknown"
-        df[col] = _safe_transform(col, df[col])
-
-    df["Hour_Weekday"] = df["Hour"] * df["Weekday"]
-
-    X = df.reindex(columns=FEATURE_COLUMNS, fill_value=0)
-    return X
+def preprocess_input(data: dict) -> np.ndarray:
+    return preprocess_records([data])
 
 # Predicts the expected response time in hours for a new service request using LightGBM model
 def predict_response_time(new_request: dict) -> float:
-    X = preprocess_input(new_request)
-    yhat = MODEL.predict(X)
-    y = float(yhat[0]) if isinstance(yhat, (list, tuple, np.ndarray)) else float(yhat)
-    return float(round(y, 2))
+    if MICRO_BATCH_ENABLED:
+        return DURATION_BATCHER.submit(new_request)
+    return predict_response_time_batch([new_request])[0]
+
+# Predicts response times for a batch of requests with a single model call over the rows not already cached
+def predict_response_time_batch(records: List[dict], features: Optional[FeatureSet] = None,
+                                model: Optional[DurationModel] = None) -> List[float]:
+    model = model or get_model()
+    if features is None:
+        features = build_features(records)
+    encoded = features.encoded_matrix("duration", model.version, model.encoder_funcs)
+    keys = DURATION_CACHE.keys_for(encoded, model.version)
+    hours = DURATION_CACHE.get_many(keys)
+    missing = [i for i, h in enumerate(hours) if h is None]
+    if not missing:
+        return hours
+
+    X = features.matrix("duration", model.version, model.features, model.encoder_funcs)[missing]
+    with span("model_lightgbm_duration"):
+        yhat = np.ravel(model.model.predict(X)).astype(float)
+    computed = [float(round(y, 2)) for y in yhat]
+    DURATION_CACHE.put_many([keys[i] for i in missing], computed)
+    for i, value in zip(missing, computed):
+        hours[i] = value
+    return hours
+
+# Concurrent single-request calls share one model call when PREDICT_MICRO_BATCH=1
+DURATION_BATCHER = MicroBatcher("duration", predict_response_time_batch)
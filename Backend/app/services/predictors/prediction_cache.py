@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
+
+# Fingerprints model/encoder artifacts by path, size and mtime so cached predictions from older artifacts never match
+def artifact_fingerprint(paths: Iterable[str]) -> str:
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            digest.update(f"{path}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+# Bounded, thread-safe LRU cache with per-entry TTL for deterministic model outputs
+class PredictionCache:
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    # Builds one cache key per row of an encoded feature matrix
+    @staticmethod
+    def keys_for(matrix: np.ndarray, version: str) -> List[tuple]:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        return [(version, row.tobytes()) for row in matrix]
+
+    def get_many(self, keys: List[tuple]) -> List[Optional[float]]:
+        if not self.enabled:
+            return [None] * len(keys)
+        now = time.monotonic()
+        out: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                elif now - entry[1] > self.ttl:
+                    del self._data[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    out.append(entry[0])
+        return out
+
+    def put_many(self, keys: List[tuple], values: Iterable[float]):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._data[key] = (value, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+OVERDUE_CACHE = PredictionCache()
+DURATION_CACHE = PredictionCache()
+
+
+# Hit/miss/eviction counters for both prediction caches
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    return {"overdue": OVERDUE_CACHE.stats(), "duration": DURATION_CACHE.stats()}
@@ -0,0 +1,154 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.predictors.features import build_features
+from app.services.predictors.micro_batcher import MICRO_BATCH_ENABLED
+from app.services.predictors.parallel_inference import INFERENCE_POOL
+from app.services.predictors.overdue_risk_predictor import predict_combined_risk, predict_combined_risk_batch
+from app.services.predictors.predict_response_time import predict_response_time, predict_response_time_batch
+from app.services.reconciliation.prediction_reconciler import reconcile_predictions
+from app.services.service_request_logic import calculate_sla, create_new_service_request, save_ticket_prediction
+from app.services.sla_service import SLA_SERVICE
+from app.timing import record_span, span
+
+
+# Scores a batch of ticket payloads: each model runs once over all rows, then every ticket is reconciled against its SLA
+def predict_batch(records: List[dict]) -> List[Dict[str, Any]]:
+    if not records:
+        return []
+
+    with span("features"):
+        features = build_features(records)
+    probs = predict_combined_risk_batch(records, features)
+    hours = predict_response_time_batch(records, features)
+
+    sla_hours = SLA_SERVICE.get_hours_many([record.get("SubCategory", "") for record in records])
+    results = []
+    with span("reconcile"):
+        for prob, predicted_hours, sla in zip(probs, hours, sla_hours):
+            results.append({
+                "is_overdue": prob,
+                "expected_response_time_hours": predicted_hours,
+                "reconciled": reconcile_predictions(predicted_hours, prob, int(sla), w=0.5),
+            })
+    return results
+
+
+# Runs the full prediction for one ticket exactly once: SLA lookup, shared features, duration and overdue models,
+# then reconciliation. The result feeds both the stored document and the HTTP response.
+class TicketPrediction:
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.timings: Dict[str, float] = {}
+        self.sla_hours: Any = None
+        self.prob_overdue: Optional[float] = None
+        self.predicted_hours: Optional[float] = None
+        self.fused: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    # Records the wall time of a stage in milliseconds; it is also a timing span of the current request
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(elapsed * 1000, 3)
+            record_span(name, elapsed)
+
+    def run(self) -> "TicketPrediction":
+        start = time.perf_counter()
+        records = [self.payload]
+
+        with self.stage("sla"):
+            self.sla_hours = calculate_sla(self.payload.get("SubCategory", ""))
+        with self.stage("features"):
+            features = build_features(records)
+        with self.stage("overdue_model"):
+            if MICRO_BATCH_ENABLED:
+                self.prob_overdue = float(predict_combined_risk(self.payload))
+            else:
+                self.prob_overdue = float(predict_combined_risk_batch(records, features)[0])
+
+        try:
+            with self.stage("duration_model"):
+                if MICRO_BATCH_ENABLED:
+                    self.predicted_hours = float(predict_response_time(self.payload))
+                else:
+                    self.predicted_hours = float(predict_response_time_batch(records, features)[0])
+            with self.stage("reconcile"):
+                self.fused = reconcile_predictions(self.predicted_hours, self.prob_overdue, self.sla_hours, w=0.5)
+        except Exception as e:
+            self.error = str(e)
+
+        self.timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+        return self
+
+    # Same stages as run, but the duration model and each overdue model run concurrently on INFERENCE_POOL
+    # and are joined before reconciliation; stage timings overlap, so they can add up to more than the total
+    def run_parallel(self) -> "TicketPrediction":
+        start = time.perf_counter()
+        records = [self.payload]
+
+        with self.stage("sla"):
+            self.sla_hours = calculate_sla(self.payload.get("SubCategory", ""))
+        with self.stage("features"):
+            features = build_features(records)
+
+        def duration_model() -> float:
+            with self.stage("duration_model"):
+                return float(predict_response_time_batch(records, features)[0])
+
+        duration = INFERENCE_POOL.submit(duration_model)
+        with self.stage("overdue_model"):
+            self.prob_overdue = float(predict_combined_risk_batch(records, features, executor=INFERENCE_POOL)[0])
+
+        try:
+            self.predicted_hours = duration.result()
+            with self.stage("reconcile"):
+                self.fused = reconcile_predictions(self.predicted_hours, self.prob_overdue, self.sla_hours, w=0.5)
+        except Exception as e:
+            self.error = str(e)
+
+        self.timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+        return self
+
+
+# Computes the prediction context for a new ticket
+def predict_ticket(payload: dict) -> TicketPrediction:
+    return TicketPrediction(payload).run()
+
+
+# Inserts a new ticket while it is being scored: the insert overlaps the model calls, then the prediction
+# is written onto the inserted document. Returns the prediction and the insert's ticket metadata.
+# Only a failed insert raises: once the ticket is stored, scoring or write-back errors are recorded and the
+# caller answers with the null-prediction fallback, since a 500 would make clients retry and duplicate the ticket.
+def predict_and_create_ticket(payload: dict) -> Tuple[TicketPrediction, Dict[str, Any]]:
+    prediction = TicketPrediction(payload)
+
+    def insert() -> Dict[str, Any]:
+        with prediction.stage("db_insert"):
+            return create_new_service_request(payload)
+
+    inserted = INFERENCE_POOL.submit(insert)
+    try:
+        prediction.run_parallel()
+    except Exception as e:
+        prediction.fused = None
+        prediction.error = str(e)
+    ticket_meta = inserted.result()
+    if prediction.sla_hours is None:
+        prediction.sla_hours = ticket_meta.get("sla_time")
+
+    try:
+        with prediction.stage("db_update"):
+            if prediction.fused is None:
+                # Keeps the SLA the insert stored and marks the ticket failed with the scoring error
+                save_ticket_prediction(ticket_meta["request_id"], error=prediction.error)
+            else:
+                save_ticket_prediction(ticket_meta["request_id"], prediction)
+    except Exception as e:
+        print(f"Failed to save the prediction of ticket {ticket_meta['request_id']}: {e}")
+    return prediction, ticket_meta
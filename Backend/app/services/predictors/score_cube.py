@@ -0,0 +1,119 @@
+import json
+import os
+from typing import Callable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.predictors.encoding import CategoryTable
+from app.services.predictors.prediction_cache import artifact_fingerprint
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CUBE_DIR = os.getenv("SCORE_CUBE_DIR") or os.path.join(APP_DIR, "ml_models", "cubes")
+
+# Value ranges of the integer features a cube can enumerate
+INTEGER_AXES = {"Hour": 24, "Weekday": 7}
+
+
+# Paths of a model's cube array and its metadata file
+def cube_paths(model_name: str) -> Tuple[str, str]:
+    base = os.path.join(CUBE_DIR, f"{model_name}_cube")
+    return base + ".npy", base + ".json"
+
+
+# Size of every axis of the cube, or None if a column is not a finite categorical/integer feature
+def cube_shape(columns: Sequence[str], tables: Mapping[str, CategoryTable]) -> Optional[Tuple[int, ...]]:
+    shape = []
+    for col in columns:
+        if col in tables:
+            # Codes run 0..len-1 plus the unknown code, which may sit one past the last class
+            shape.append(max(len(tables[col]), tables[col].unknown_code) + 1)
+        elif col in INTEGER_AXES:
+            shape.append(INTEGER_AXES[col])
+        else:
+            return None
+    return tuple(shape)
+
+
+# Scores every combination of codes with the model and writes the result as a .npy cube plus metadata
+def build_cube(model_name: str, score: Callable[[np.ndarray], np.ndarray], columns: Sequence[str],
+               tables: Mapping[str, CategoryTable], artifact_paths: Sequence[str]) -> dict:
+    shape = cube_shape(columns, tables)
+    if shape is None:
+        raise ValueError(f"{model_name} uses features that cannot be enumerated: {list(columns)}")
+
+    array_path, meta_path = cube_paths(model_name)
+    os.makedirs(CUBE_DIR, exist_ok=True)
+    tmp_path = array_path + ".tmp.npy"
+    cube = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=shape)
+
+    # One model call per value of the first axis keeps memory bounded while batching the rest
+    rest = np.indices(shape[1:]).reshape(len(shape) - 1, -1).T
+    X = np.empty((len(rest), len(shape)), dtype=np.float64)
+    X[:, 1:] = rest
+    for first in range(shape[0]):
+        X[:, 0] = first
+        cube[first] = np.asarray(score(X), dtype=np.float64).reshape(shape[1:])
+    cube.flush()
+    del cube
+    os.replace(tmp_path, array_path)
+
+    meta = {
+        "model": model_name,
+        "columns": list(columns),
+        "shape": list(shape),
+        "fingerprint": artifact_fingerprint(artifact_paths),
+    }
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+    return meta
+
+
+# Memory-mapped score cube: scores a feature matrix by index lookup, deferring out-of-range rows to the live model
+class ScoreCube:
+    def __init__(self, model_name: str, scores: np.ndarray, columns: Sequence[str]):
+        self.model_name = model_name
+        self.scores = scores
+        self.columns = list(columns)
+        self.shape = np.asarray(scores.shape, dtype=np.int64)
+        self.hits = 0
+        self.fallbacks = 0
+
+    # Opens the cube if it exists and was built from the same artifacts and encoder sizes
+    @classmethod
+    def load(cls, model_name: str, columns: Sequence[str], tables: Mapping[str, CategoryTable],
+             artifact_paths: Sequence[str]) -> Optional["ScoreCube"]:
+        array_path, meta_path = cube_paths(model_name)
+        if not (os.path.exists(array_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            expected = cube_shape(columns, tables)
+            if meta.get("columns") != list(columns) or tuple(meta.get("shape", ())) != expected:
+                print(f"Score cube for {model_name} does not match the current features, ignoring it")
+                return None
+            if meta.get("fingerprint") != artifact_fingerprint(artifact_paths):
+                print(f"Score cube for {model_name} was built from other artifacts, ignoring it")
+                return None
+            scores = np.load(array_path, mmap_mode="r")
+            if tuple(scores.shape) != expected:
+                return None
+            return cls(model_name, scores, columns)
+        except Exception as e:
+            print(f"Error loading score cube for {model_name}: {e}")
+            return None
+
+    # Looks up every row of X (columns in cube order); rows with codes outside the cube go through fallback
+    def predict(self, X: np.ndarray, fallback: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        codes = np.asarray(X).astype(np.int64)
+        inside = np.all((codes >= 0) & (codes < self.shape), axis=1)
+        out = np.empty(len(codes), dtype=np.float64)
+        if inside.any():
+            flat = np.ravel_multi_index(codes[inside].T, tuple(self.shape))
+            out[inside] = self.scores.reshape(-1)[flat]
+        if not inside.all():
+            out[~inside] = fallback(np.asarray(X)[~inside])
+        hit_count = int(inside.sum())
+        self.hits += hit_count
+        self.fallbacks += len(codes) - hit_count
+        return out
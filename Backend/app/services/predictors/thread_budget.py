@@ -0,0 +1,82 @@
+import os
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from app.services.predictors.parallel_inference import PARALLEL_INFERENCE_ENABLED, PARALLEL_INFERENCE_WORKERS
+
+load_dotenv()
+# Server topology: worker processes and request threads per worker (the same variables the server config reads)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+WEB_THREADS = int(os.getenv("WEB_THREADS", "1"))
+# "0" leaves every library on its own default (usually one thread per core for each call)
+MODEL_THREAD_BUDGET = os.getenv("MODEL_THREAD_BUDGET", "1") == "1"
+# Fixed threads per model call; unset derives it from the topology, capped at MODEL_THREADS_MAX
+MODEL_THREADS = int(os.getenv("MODEL_THREADS", "0"))
+MODEL_THREADS_MAX = int(os.getenv("MODEL_THREADS_MAX", "4"))
+# n_jobs of the hyper-parameter searches in app/training; -1 uses every core
+TRAINING_N_JOBS = int(os.getenv("TRAINING_N_JOBS", "-1"))
+
+
+# Cores this process may run on
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Splits the cores between every model call that can run at the same time on this machine
+class ThreadBudget:
+    def __init__(self, cpus: int = None, workers: int = WEB_CONCURRENCY, threads: int = WEB_THREADS):
+        self.cpus = cpus or available_cpus()
+        self.workers = max(1, workers)
+        # With parallel inference the shared pool, not the request threads, bounds concurrent model calls
+        self.concurrent_calls = PARALLEL_INFERENCE_WORKERS if PARALLEL_INFERENCE_ENABLED else max(1, threads)
+        if MODEL_THREADS > 0:
+            self.per_call = MODEL_THREADS
+        else:
+            self.per_call = max(1, min(MODEL_THREADS_MAX, self.cpus // (self.workers * self.concurrent_calls)))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "enabled": MODEL_THREAD_BUDGET,
+            "cpus": self.cpus,
+            "workers": self.workers,
+            "concurrent_calls_per_worker": self.concurrent_calls,
+            "threads_per_call": self.per_call,
+        }
+
+
+# Serves predict / predict_proba of a model whose thread count can only be passed per call (CatBoost)
+class ThreadLimitedModel:
+    def __init__(self, model, **predict_kwargs):
+        self.model = model
+        self.predict_kwargs = predict_kwargs
+        if hasattr(model, "predict_proba"):
+            self.predict_proba = self._predict_proba
+
+    def predict(self, X):
+        return self.model.predict(X, **self.predict_kwargs)
+
+    def _predict_proba(self, X):
+        return self.model.predict_proba(X, **self.predict_kwargs)
+
+
+THREAD_BUDGET = ThreadBudget()
+
+
+# Applies the per-call thread budget to a loaded estimator; returns the object to serve predictions from
+def limit_threads(estimator: Any, threads: int = None) -> Any:
+    if not MODEL_THREAD_BUDGET:
+        return estimator
+    threads = threads or THREAD_BUDGET.per_call
+    module = type(estimator).__module__.split(".")[0]
+    if module == "catboost":
+        return ThreadLimitedModel(estimator, thread_count=threads)
+    if module in ("xgboost", "lightgbm"):
+        # XGBoost forwards n_jobs to the booster's nthread; LightGBM passes it to predict as num_threads
+        estimator.set_params(n_jobs=threads)
+    elif hasattr(estimator, "n_jobs"):
+        estimator.n_jobs = threads
+    return estimator
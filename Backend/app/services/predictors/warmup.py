@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+MODEL_WARMUP_ON_STARTUP = os.getenv("MODEL_WARMUP_ON_STARTUP", "1") == "1"
+
+# A representative request scored once after loading so the first real request does not pay for lazy library init
+WARMUP_REQUEST = {
+    "MainCategory": "A. Cleaning",
+    "SubCategory": "Cleaning needed in Office",
+    "Building": "A1",
+    "Site": "A",
+    "Description": "Warm-up request",
+    "Created on": "03/05/2024 14:30",
+}
+
+PENDING, LOADING, LOADED, FAILED = "pending", "loading", "loaded", "failed"
+
+
+# Loads the overdue ensemble, encoders and score cubes
+def _load_overdue():
+    from app.services.predictors import overdue_risk_predictor
+    overdue_risk_predictor.get_models()
+
+
+# Loads the duration model and its encoders
+def _load_duration():
+    from app.services.predictors import predict_response_time
+    predict_response_time.get_model()
+
+
+# Builds the SLA index
+def _load_sla():
+    from app.services.sla_service import SLA_SERVICE
+    SLA_SERVICE.index()
+
+
+# Runs one end-to-end batch prediction through every model
+def _warmup_inference():
+    from app.services.predictors.prediction_pipeline import predict_batch
+    predict_batch([WARMUP_REQUEST])
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("overdue_models", _load_overdue),
+    ("duration_model", _load_duration),
+    ("sla_index", _load_sla),
+    ("warmup_inference", _warmup_inference),
+]
+# Steps that run the models. The OpenMP thread pools they start do not survive a fork and a forked worker can hang on
+# its first prediction, so a pre-forking master leaves these to the workers.
+INFERENCE_STEPS = {"warmup_inference"}
+
+
+# Tracks the background warm-up of this worker process
+class ModelWarmup:
+    def __init__(self, steps: List[Tuple[str, Callable[[], Any]]] = WARMUP_STEPS):
+        self.steps = steps
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.status: Dict[str, str] = {name: PENDING for name, _ in steps}
+        self.errors: Dict[str, str] = {}
+        self.timings_ms: Dict[str, float] = {}
+
+    def _run(self, steps: List[Tuple[str, Callable[[], Any]]] = None):
+        for name, step in steps or self.steps:
+            self.status[name] = LOADING
+            start = time.perf_counter()
+            try:
+                step()
+                self.status[name] = LOADED
+            except Exception as e:
+                self.status[name] = FAILED
+                self.errors[name] = str(e)
+                print(f"Model warm-up step {name} failed: {e}")
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    # Starts the warm-up thread once per process (threads do not survive a fork, so a forked worker starts its own)
+    def start(self) -> bool:
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return False
+            self.status = {name: PENDING for name, _ in self.steps}
+            self.errors = {}
+            self.timings_ms = {}
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    # Runs the steps in the calling thread; a pre-forking server does this in the master so workers inherit the models.
+    # Without inference the model-running steps stay pending for each worker's own warm-up (start_background_tasks).
+    def load_now(self, inference: bool = False):
+        with self._lock:
+            self.status = {name: PENDING for name, _ in self.steps}
+            self.errors = {}
+            self.timings_ms = {}
+            self._run([(name, step) for name, step in self.steps if inference or name not in INFERENCE_STEPS])
+
+    # Whether this process's warm-up thread is still running
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and self._pid == os.getpid() and thread.is_alive()
+
+    # Readiness report: warm-up steps by state, per-model load errors and step timings. Ready follows what is
+    # actually loaded in this process (models also load lazily on first use), not which warm-up steps have run.
+    def report(self) -> Dict[str, Any]:
+        from app.services.predictors import overdue_risk_predictor, predict_response_time
+
+        status = dict(self.status)
+        models = overdue_risk_predictor.get_models() if overdue_risk_predictor.is_loaded() else None
+        models_loaded = models is not None and predict_response_time.is_loaded()
+        return {
+            "ready": models_loaded and not self.running(),
+            "models_loaded": models_loaded,
+            "warming_up": self.running(),
+            "loaded": [name for name, state in status.items() if state == LOADED],
+            "overdue_models": sorted(models.models) if models is not None else [],
+            "model_version": (models.registry_version or "legacy") if models is not None else None,
+            "loading": [name for name, state in status.items() if state == LOADING],
+            "pending": [name for name, state in status.items() if state == PENDING],
+            "failed": dict(self.errors),
+            "load_errors": dict(overdue_risk_predictor.LOAD_ERRORS),
+            "timings_ms": dict(self.timings_ms),
+        }
+
+
+MODEL_WARMUP = ModelWarmup()
+
+
+# Starts loading models in the background of this process
+def start_warmup() -> bool:
+    return MODEL_WARMUP.start()
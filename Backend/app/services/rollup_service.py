@@ -0,0 +1,139 @@
+from datetime import datetime
+from dotenv import load_dotenv
+import os
+
+from app.db import DATABASE_NAME, get_collection
+from app.indexes import INDEX_REGISTRY
+from app.models.service_request_model import parse_request_datetime, CREATED_ON_AS_DATE
+
+load_dotenv()
+ROLLUP_COLLECTION = "daily_rollups"
+# Backfills build here, then replace ROLLUP_COLLECTION in one rename
+ROLLUP_STAGING_COLLECTION = f"{ROLLUP_COLLECTION}_rebuild"
+
+# Collections that have rollups
+ROLLUP_SOURCES = ("service_requests", "newRequests")
+
+# Rollup documents are keyed by source/site/day/category/status; "weekday" follows $dayOfWeek (1 = Sunday)
+
+
+# Builds the rollup _id and descriptive fields for a single request document, or None if it has no usable date
+def rollup_key(document: dict, source: str):
+    created = parse_request_datetime(document.get("Created on"))
+    if created is None:
+        return None, None
+    day = datetime(created.year, created.month, created.day)
+    key = {
+        "source": source,
+        "site": document.get("Site"),
+        "date": day,
+        "main": document.get("MainCategory"),
+        "sub": document.get("SubCategory"),
+        "status": document.get("Request status"),
+    }
+    fields = {
+        "year": day.year,
+        "month": day.month,
+        "weekday": day.isoweekday() % 7 + 1,
+    }
+    return key, fields
+
+
+# Adds delta to the count of the rollup bucket the document falls into
+def record_request(document: dict, source: str, delta: int = 1) -> bool:
+    key, fields = rollup_key(document, source)
+    if key is None:
+        return False
+    collection = get_collection(DATABASE_NAME, ROLLUP_COLLECTION)
+    if collection is None:
+        return False
+    collection.update_one(
+        {"_id": key},
+        {"$inc": {"count": delta}, "$setOnInsert": fields},
+        upsert=True,
+    )
+    return True
+
+
+# Moves a document's rollup count from its previous status bucket to the new one
+def record_status_change(document: dict, source: str, new_status: str) -> bool:
+    if not record_request(document, source, -1):
+        return False
+    return record_request({**document, "Request status": new_status}, source, 1)
+
+
+# Groups one source collection into rollup documents. Dates are read with CREATED_ON_AS_DATE, which accepts
+# the same formats as parse_request_datetime on the live path, so rebuilt buckets match the ones record_request uses.
+def _rollup_pipeline(source: str) -> list:
+    return [
+        {"$project": {
+            "Site": 1, "MainCategory": 1, "SubCategory": 1, "Request status": 1,
+            "created": CREATED_ON_AS_DATE,
+        }},
+        {"$match": {"created": {"$type": "date"}}},
+        {"$group": {
+            "_id": {
+                "source": source,
+                "site": "$Site",
+                "date": {"$dateFromParts": {
+                    "year": {"$year": "$created"},
+                    "month": {"$month": "$created"},
+                    "day": {"$dayOfMonth": "$created"},
+                }},
+                "main": "$MainCategory",
+                "sub": "$SubCategory",
+                "status": "$Request status",
+            },
+            "count": {"$sum": 1},
+            "weekday": {"$first": {"$dayOfWeek": "$created"}},
+        }},
+        {"$project": {"count": 1, "weekday": 1, "year": {"$year": "$_id.date"}, "month": {"$month": "$_id.date"}}},
+    ]
+
+
+# Rebuilds the rollups of every source from scratch. The new buckets are grouped server-side into a staging
+# collection, which then replaces the live one in a single atomic rename: dashboards never read a half-built
+# collection and live $inc updates never land between a delete and the regroup. Updates made while the rebuild
+# runs go to the old collection and are not carried over, so run it when ticket traffic is quiet.
+def backfill_rollups() -> dict:
+    staging = get_collection(DATABASE_NAME, ROLLUP_STAGING_COLLECTION)
+    if staging is None:
+        return {"error": "DB connection failed"}
+
+    staging.drop()
+    summary = {}
+    for source in ROLLUP_SOURCES:
+        collection = get_collection(DATABASE_NAME, source)
+        pipeline = _rollup_pipeline(source) + [
+            {"$merge": {"into": ROLLUP_STAGING_COLLECTION, "whenMatched": "fail", "whenNotMatched": "insert"}},
+        ]
+        collection.aggregate(pipeline, allowDiskUse=True)
+        summary[source] = {"buckets": staging.count_documents({"_id.source": source})}
+
+    staging.create_indexes(INDEX_REGISTRY[(DATABASE_NAME, ROLLUP_COLLECTION)])
+    staging.rename(ROLLUP_COLLECTION, dropTarget=True)
+    return summary
+
+
+# Groups rollup counts of a source by the given period fields, per main category, sub category and weekday
+def grouped_counts(source: str, sites: list, period_fields: tuple = ()):
+    rollups = get_collection(DATABASE_NAME, ROLLUP_COLLECTION)
+    if rollups is None:
+        return None
+
+    period = {"site": "$_id.site", **{field: f"${field}" for field in period_fields}}
+    pipeline = [
+        {"$match": {"_id.source": source, "_id.site": {"$in": sites}, "count": {"$gt": 0}}},
+        {"$facet": {
+            "main_category": [
+                {"$group": {"_id": {**period, "value": "$_id.main"}, "count": {"$sum": "$count"}}},
+            ],
+            "sub_category": [
+                {"$group": {"_id": {**period, "value": "$_id.sub"}, "count": {"$sum": "$count"}}},
+            ],
+            "by_weekday": [
+                {"$group": {"_id": {**period, "value": "$weekday"}, "count": {"$sum": "$count"}}},
+            ],
+        }},
+    ]
+    return next(rollups.aggregate(pipeline), {})
@@ -1,64 +1,63 @@
+from contextlib import nullcontext
 from datetime import datetime
 from flask import jsonify
-from app.db import get_collection
-from app.services.predictors.overdue_risk_predictor import predict_combined_risk
-import json
+from app.db import DATABASE_NAME, get_collection
+from app.models.service_request_model import parse_request_datetime, format_request_datetime
+from app.services.rollup_service import record_request, record_status_change
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from app.services.sla_service import SLA_SERVICE
 
 
-# Loads SLA data from JSON file containing subcategory to hours mapping
+# Returns the SLA table (subcategory -> hours) from the in-memory SLA service
 def load_sla_data():
-    try:
-        print("Attempting to load SLA data from JSON file...")
-        with open("data/sla_data.json", "r", encoding="utf-8") as file:
-            data = json.load(file)
-            print("SLA data loaded successfully.")
-            return data
-    except Exception as e:
-        print(f"Error loading SLA data: {e}")
-        return {}
+    return dict(SLA_SERVICE.index().exact)
 
 
 # Calculates SLA hours for a given subcategory based on predefined SLA data
 def calculate_sla(sub_category: str) -> int:
-    print(f"Calculating SLA for sub-category: '{sub_category}'")
-    
-    sla_data = load_sla_data()
-    
-    if not sla_data:
-        print("No SLA data available or failed to load data.")
-        return -1
- 
-
-    if sub_category in sla_data:
-        print(f"Found SLA for '{sub_category}': {sla_data[sub_category]} hours")
-        return sla_data[sub_category]
-    
-    print(f"Sub-category '{sub_category}' not found in SLA data.")
-    return -1  
-
-
-# Creates a new service request in the database with SLA calculation and risk prediction
-def create_new_service_request(data: dict) -> dict:
-    collection = get_collection("DS_PROJECT", "newRequests")
-
-    sla_time = calculate_sla(data["SubCategory"])
-    risk_score = predict_combined_risk(data)
+    return SLA_SERVICE.get_hours(sub_category)
+
+
+# Prediction fields stored on a ticket document
+def prediction_fields(prediction) -> dict:
+    fields = {
+        "SLA (hours)": prediction.sla_hours,
+        "Risk score": prediction.prob_overdue,
+    }
+    if prediction.fused is not None:
+        fields["Predicted hours"] = prediction.fused["predicted_hours"]
+        fields["Overdue probability"] = prediction.fused["prob_final"]
+        fields["Risk bucket"] = prediction.fused["risk_bucket"]
+    return fields
+
+
+# Creates a new service request in the database from an already computed TicketPrediction,
+# or without one (prediction_status "pending") when scoring runs after the insert
+def create_new_service_request(data: dict, prediction=None) -> dict:
+    collection = get_collection(DATABASE_NAME, "newRequests")
 
     document = {
         "Type": "Service request",
-        "Created on": datetime.now().strftime("%m/%d/%Y %I:%M:%S %p"),
+        "Created on": datetime.now(),
         "Request status": "Open",
         "MainCategory": data["MainCategory"],
         "SubCategory": data["SubCategory"],
         "Building": data["Building"],
         "Site": data["Site"],
         "Request description": data["Description"],
-        "SLA (hours)": sla_time,
-        "Risk score": risk_score,
     }
+    if prediction is not None:
+        document.update(prediction_fields(prediction))
+    else:
+        document["SLA (hours)"] = calculate_sla(data.get("SubCategory", ""))
+        document["prediction_status"] = "pending"
+    sla_time = document["SLA (hours)"]
+    risk_score = document.get("Risk score")
 
     if "Resolved date" in data:
-        document["Resolved date"] = data["Resolved date"]
+        document["Resolved date"] = parse_request_datetime(data["Resolved date"]) or data["Resolved date"]
     if "Response time (hours)" in data:
         document["Response time (hours)"] = data["Response time (hours)"]
     if "Response time (days)" in data:
@@ -66,7 +65,13 @@ def create_new_service_request(data: dict) -> dict:
     if "is_overdue" in data:
         document["is_overdue"] = data["is_overdue"]
 
-    insert_result = collection.insert_one(document)
+    with prediction.stage("db_insert") if prediction is not None else nullcontext():
+        insert_result = collection.insert_one(document)
+
+    try:
+        record_request(document, "newRequests")
+    except Exception as e:
+        print(f"Failed to update daily rollups: {e}")
 
     return {
         "message": "Service request created successfully",
@@ -77,18 +82,93 @@ def create_new_service_request(data: dict) -> dict:
     }
 
 
+# Writes the result of a deferred scoring run back onto its pending ticket
+def save_ticket_prediction(request_id: str, prediction=None, error: str = None) -> bool:
+    collection = get_collection(DATABASE_NAME, "newRequests")
+    if collection is None:
+        return False
+
+    if prediction is not None and prediction.fused is not None:
+        update = {**prediction_fields(prediction), "prediction_status": "done"}
+    else:
+        update = {"prediction_status": "failed",
+                  "Prediction error": error or (prediction.error if prediction is not None else None)}
+        if prediction is not None:
+            update.update(prediction_fields(prediction))
+    result = collection.update_one({"_id": ObjectId(request_id)}, {"$set": update})
+    return result.matched_count == 1
+
+
+# Returns the stored prediction of a ticket, or None if the ticket does not exist
+def get_ticket_prediction(request_id: str):
+    collection = get_collection(DATABASE_NAME, "newRequests")
+    if collection is None:
+        return None
+    try:
+        object_id = ObjectId(request_id)
+    except (InvalidId, TypeError):
+        return None
+
+    document = collection.find_one({"_id": object_id}, {
+        "prediction_status": 1, "SLA (hours)": 1, "Risk score": 1, "Predicted hours": 1,
+        "Overdue probability": 1, "Risk bucket": 1, "Prediction error": 1,
+    })
+    if document is None:
+        return None
+    # Tickets scored before insert carry no status field
+    status = document.get("prediction_status") or ("done" if "Risk bucket" in document else "failed")
+    return {
+        "request_id": request_id,
+        "prediction_status": status,
+        "predicted_hours": document.get("Predicted hours"),
+        "sla_hours": document.get("SLA (hours)"),
+        "overdue_probability": document.get("Overdue probability"),
+        "risk_bucket": document.get("Risk bucket"),
+        "risk_score": document.get("Risk score"),
+        "error": document.get("Prediction error"),
+    }
+
+
 
 from app.db import get_collection
 from datetime import datetime
 from flask import jsonify
 
 
+# Marks an open service request as closed and moves its daily rollup count to the closed bucket
+def close_service_request(request_id: str):
+    collection = get_collection(DATABASE_NAME, "newRequests")
+    if collection is None:
+        return None
+
+    try:
+        object_id = ObjectId(request_id)
+    except (InvalidId, TypeError):
+        return None
+
+    closed_at = datetime.now()
+    document = collection.find_one_and_update(
+        {"_id": object_id, "Request status": "Open"},
+        {"$set": {"Request status": "Closed", "Resolved date": closed_at}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if document is None:
+        return None
+
+    try:
+        record_status_change(document, "newRequests", "Closed")
+    except Exception as e:
+        print(f"Failed to update daily rollups: {e}")
+
+    return {"request_id": request_id, "Request status": "Closed", "Resolved date": format_request_datetime(closed_at)}
+
+
 # Retrieves all open service requests from the database with formatted data
 def get_open_requests():
     try:
         print("Fetching open requests from the database...")  
 
-        collection = get_collection("DS_PROJECT", "newRequests")
+        collection = get_collection(DATABASE_NAME, "newRequests")
         
         if collection is None:
             print("Failed to connect to the database collection.")
@@ -102,7 +182,7 @@ def get_open_requests():
 
             request_data = {
                 "id": str(request.get("_id", "")),  
-                "Created on": request.get("Created on", ""),
+                "Created on": format_request_datetime(request.get("Created on", ""), "%m/%d/%Y %I:%M:%S %p"),
                 "Request status": request.get("Request status", ""),
                 "MainCategory": request.get("MainCategory", ""),
                 "SubCategory": request.get("SubCategory", ""),
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.db import DATABASE_NAME, get_collection
+
+load_dotenv()
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SLA_PATH = os.getenv("SLA_DATA_PATH") or os.path.join(BACKEND_DIR, "data", "sla_data.json")
+SLA_SOURCE = os.getenv("SLA_SOURCE", "file")
+SLA_CACHE_TTL_SECONDS = float(os.getenv("SLA_CACHE_TTL_SECONDS", "300"))
+# How often the file's mtime is re-checked; stat() on every lookup would be wasted syscalls under load
+SLA_MTIME_CHECK_SECONDS = float(os.getenv("SLA_MTIME_CHECK_SECONDS", "1"))
+
+MISSING_SLA = -1
+
+
+# Normalises a sub category for lookup: collapses whitespace and ignores case
+def normalise_key(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+# Immutable SLA table with exact and normalised-key indexes, built once per load
+class SlaIndex:
+    __slots__ = ("exact", "normalised", "loaded_at", "source")
+
+    def __init__(self, data: Dict[str, int], source: str):
+        self.exact = MappingProxyType(dict(data))
+        self.normalised = MappingProxyType({normalise_key(k): v for k, v in data.items()})
+        self.loaded_at = time.monotonic()
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def lookup(self, sub_category) -> int:
+        if sub_category in self.exact:
+            return self.exact[sub_category]
+        return self.normalised.get(normalise_key(sub_category), MISSING_SLA)
+
+    def lookup_many(self, sub_categories: Sequence) -> np.ndarray:
+        cache = {}
+        out = np.empty(len(sub_categories), dtype=np.float64)
+        for i, sub_category in enumerate(sub_categories):
+            if sub_category not in cache:
+                cache[sub_category] = self.lookup(sub_category)
+            out[i] = cache[sub_category]
+        return out
+
+
+# Serves SLA hours from an in-memory index, reloading it when sla_data.json changes (or the Mongo cache expires)
+class SlaService:
+    def __init__(self, path: str = SLA_PATH, source: str = SLA_SOURCE, ttl: float = SLA_CACHE_TTL_SECONDS):
+        self.path = path
+        self.source = source
+        self.ttl = ttl
+        self._index: Optional[SlaIndex] = None
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _read_file(self) -> Dict[str, int]:
+        with open(self.path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _read_mongo(self) -> Optional[Dict[str, int]]:
+        collection = get_collection(DATABASE_NAME, "sla")
+        if collection is None:
+            return None
+        data = {doc["SubCategory"]: doc["SLA (hours)"]
+                for doc in collection.find({}, {"_id": 0, "SubCategory": 1, "SLA (hours)": 1})
+                if "SubCategory" in doc and "SLA (hours)" in doc}
+        return data or None
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _is_stale(self, now: float) -> bool:
+        if self._index is None:
+            return True
+        if self.source == "mongo":
+            return now - self._index.loaded_at >= self.ttl
+        return self._file_mtime() != self._mtime
+
+    def _load(self) -> SlaIndex:
+        if self.source == "mongo":
+            try:
+                data = self._read_mongo()
+                if data is not None:
+                    return SlaIndex(data, "mongo")
+            except Exception as e:
+                print(f"Error loading SLA data from MongoDB, falling back to file: {e}")
+        # The mtime is taken before reading (a write during the read is picked up next time) but only recorded
+        # once the file parsed, so a failed read is retried instead of keeping the stale index
+        mtime = self._file_mtime()
+        index = SlaIndex(self._read_file(), "file")
+        self._mtime = mtime
+        return index
+
+    # Returns the current index, reloading it first if the source changed
+    def index(self) -> SlaIndex:
+        now = time.monotonic()
+        index = self._index
+        if index is not None and now < self._next_check:
+            return index
+        with self._lock:
+            if self._is_stale(now):
+                try:
+                    self._index = self._load()
+                except Exception as e:
+                    print(f"Error loading SLA data: {e}")
+                    if self._index is None:
+                        self._index = SlaIndex({}, "empty")
+                self._next_check = now + SLA_MTIME_CHECK_SECONDS
+        return self._index
+
+    def get_hours(self, sub_category) -> int:
+        return self.index().lookup(sub_category)
+
+    def get_hours_many(self, sub_categories: Sequence) -> np.ndarray:
+        return self.index().lookup_many(sub_categories)
+
+
+SLA_SERVICE = SlaService()
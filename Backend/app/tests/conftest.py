@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+# Timing tests are marked @pytest.mark.benchmark and only run with RUN_BENCHMARKS=1, on a quiet machine
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS", "0") == "1"
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timing test, runs only with RUN_BENCHMARKS=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if RUN_BENCHMARKS:
+        return
+    skip = pytest.mark.skip(reason="timing benchmark, set RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
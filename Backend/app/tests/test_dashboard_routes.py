@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+import app.memory_budget as memory_budget
+import app.services.dashboard_service as dashboard_service
+from app import create_app
+
+
+# Collection whose rate aggregation matches no tickets, as MongoDB returns it for an empty range
+class EmptyRatesCollection:
+    def aggregate(self, pipeline, **kwargs):
+        return iter([{"opening_rate": [], "closing_rate": []}])
+
+
+# Collection that records the rate pipelines it runs and matches no tickets
+class RecordingRatesCollection(EmptyRatesCollection):
+    def __init__(self):
+        self.pipelines = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return super().aggregate(pipeline, **kwargs)
+
+
+# Collection too large for the memory budget as a whole, holding one ticket stored with a legacy string date
+class LargeCollection:
+    def __init__(self):
+        self.filters = []
+
+    def estimated_document_count(self):
+        return 10_000_000
+
+    def count_documents(self, query):
+        return 1
+
+    def find(self, query, projection=None):
+        self.filters.append(query)
+        return iter([{"Site": "A", "Created on": "03/05/2099 14:30", "Resolved date": datetime(2099, 3, 6)}])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(dashboard_service, "get_collection", lambda database, name: EmptyRatesCollection())
+    return create_app(start_background=False).test_client()
+
+
+# An empty range is a JSON 404 from the service, not a 500 from the route
+def test_rates_for_empty_range_return_404(client):
+    response = client.get("/api/dashboard-data?mode=rates&start=2030-01-01&end=2030-01-31")
+    assert response.status_code == 404
+    assert response.get_json() == {"message": "No requests found with valid dates"}
+
+
+# The end bound of a rate range keeps tickets whose "Created on" is still a legacy string
+def test_rates_end_bound_keeps_string_dates(client, monkeypatch):
+    collection = RecordingRatesCollection()
+    monkeypatch.setattr(dashboard_service, "get_collection", lambda database, name: collection)
+    client.get("/api/dashboard-data?mode=rates&start=2024-01-01&end=2024-01-31")
+    [pipeline] = collection.pipelines
+    dates, strings = pipeline[0]["$match"]["$or"]
+    assert dates == {"Created on": {"$lt": datetime(2024, 2, 1)}}
+    assert strings["Created on"] == {"$type": "string"}
+    assert strings["$expr"] == {"$lt": [dashboard_service.CREATED_ON_AS_DATE, datetime(2024, 2, 1)]}
+
+
+# A DB failure keeps the service's 500 and JSON body
+def test_rates_without_db_return_json_500(client, monkeypatch):
+    monkeypatch.setattr(dashboard_service, "get_collection", lambda database, name: None)
+    response = client.get("/api/dashboard-data?mode=rates")
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "DB connection failed"}
+
+
+# An over-budget load is cut to recent requests, keeps legacy string dates in its filter, and tells the caller
+# through a header the browser is allowed to read
+def test_degraded_load_is_flagged_and_keeps_string_dates(client, monkeypatch):
+    collection = LargeCollection()
+    monkeypatch.setattr(dashboard_service, "get_collection", lambda database, name: collection)
+    budget = memory_budget.DashboardMemoryBudget(budget_mb=1, mode="degrade")
+    monkeypatch.setattr(memory_budget, "DASHBOARD_MEMORY", budget)
+    response = client.get("/api/dashboard-data", headers={"Origin": "http://localhost:3000"})
+    assert response.status_code == 200
+    assert response.headers[memory_budget.DEGRADED_HEADER].startswith("since=")
+    assert memory_budget.DEGRADED_HEADER in response.headers["Access-Control-Expose-Headers"]
+    [query] = collection.filters
+    legacy = query["$or"][1]
+    assert legacy["Created on"] == {"$type": "string"} and "$expr" in legacy
@@ -0,0 +1,71 @@
+import time
+import numpy as np
+import pytest
+import warnings
+
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+from app.services.predictors.features import build_features
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+
+SAMPLE_REQUEST = {
+    "MainCategory": "A. Cleaning",
+    "SubCategory": "Cleaning needed in Office",
+    "Building": "A1",
+    "Site": "A",
+    "Description": "Urgent: coffee spilled in the meeting room",
+    "Created on": "03/05/2024 14:30",
+}
+
+BUDGET_MS = 1.0
+
+
+# Builds every model's feature matrix for the given records, as one prediction request does
+def prepare_all(records):
+    features = build_features(records)
+    matrices = [overdue.preprocess_records(records, name, features) for name in overdue.get_models().features]
+    matrices.append(duration.preprocess_records(records, features))
+    return matrices
+
+
+# Times repeated calls and returns the median in milliseconds
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+# Every model gets one feature row per request
+def test_feature_prep_shapes():
+    for size in (1, 32):
+        matrices = prepare_all([SAMPLE_REQUEST] * size)
+        assert matrices
+        for X in matrices:
+            assert X.shape[0] == size
+
+
+# Microbenchmark: feature preparation for every model of a single request must stay under BUDGET_MS
+@pytest.mark.benchmark
+def test_single_request_feature_prep():
+    single = median_ms(lambda: prepare_all([SAMPLE_REQUEST]), repeat=500)
+    assert single < BUDGET_MS, f"{single:.3f} ms"
+
+
+# Batching amortizes feature preparation: a row of a large batch must cost less than a single request
+@pytest.mark.benchmark
+def test_batch_feature_prep():
+    single = median_ms(lambda: prepare_all([SAMPLE_REQUEST]), repeat=200)
+    for size in (32, 1024):
+        records = [SAMPLE_REQUEST] * size
+        batch = median_ms(lambda: prepare_all(records), repeat=20)
+        assert batch / size < single, f"batch of {size}: {batch / size:.4f} ms per row, single {single:.3f} ms"
+
+
+if __name__ == "__main__":
+    test_feature_prep_shapes()
+    test_single_request_feature_prep()
+    test_batch_feature_prep()
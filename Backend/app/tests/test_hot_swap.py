@@ -0,0 +1,85 @@
+import copy
+import warnings
+
+import pytest
+
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+from app.services.predictors import hot_swap
+from app.services.predictors.encoding import CategoryTable
+from app.services.predictors.features import build_features
+from app.services.predictors.hot_swap import NO_CACHE, VALIDATION_REQUESTS, validate_candidate
+from app.services.predictors.prediction_cache import OVERDUE_CACHE
+
+
+# Stands in for an ensemble member whose artifact loads but cannot score
+class BrokenModel:
+    def predict_proba(self, X):
+        raise ValueError("feature shape mismatch")
+
+    def predict(self, X):
+        raise ValueError("feature shape mismatch")
+
+
+# A fresh copy of the served overdue models, with every member replaced by the given model
+def candidate_with(model):
+    candidate = copy.copy(overdue.load_models())
+    candidate.models = {name: model for name in candidate.models}
+    candidate.cubes = {}
+    return candidate
+
+
+# A fresh copy of the served overdue models as a retrain that refit its encoders: every label gets another code
+def candidate_with_refit_encoders():
+    candidate = copy.copy(overdue.load_models())
+    candidate.encoder_tables = {
+        col: CategoryTable(col, list(reversed(list(table._codes))), table.strip)
+        for col, table in candidate.encoder_tables.items()
+    }
+    candidate.encoder_funcs = {col: table.encode for col, table in candidate.encoder_tables.items()}
+    candidate.cubes = {}
+    candidate.version = "refit-encoders"
+    return candidate
+
+
+# A candidate built from the same artifacts as the served models passes
+def test_reloaded_models_validate():
+    checks = validate_candidate(overdue.load_models(), duration.load_model())
+    assert checks["max_prob_drift"] == 0.0
+
+
+# A candidate whose members all fail is rejected, although the ensemble would fall back to 0.5 for every ticket
+def test_broken_candidate_is_rejected():
+    candidate = candidate_with(BrokenModel())
+    assert overdue.predict_combined_risk_batch([{"Site": "A"}], models=candidate) == [0.5]
+    with pytest.raises(ValueError, match="failed to score"):
+        validate_candidate(candidate, duration.load_model())
+
+
+# A candidate whose duration model fails is rejected
+def test_broken_duration_model_is_rejected():
+    candidate_duration = copy.copy(duration.load_model())
+    candidate_duration.model = BrokenModel()
+    with pytest.raises(ValueError, match="duration model failed"):
+        validate_candidate(overdue.load_models(), candidate_duration)
+
+
+# Drift compares each model set on its own encoding of the validation requests, and validation leaves the served
+# prediction cache alone
+def test_drift_uses_each_model_sets_encoders(monkeypatch):
+    monkeypatch.setattr(hot_swap, "MODEL_SWAP_MAX_PROB_DRIFT", 0.0)
+    candidate = candidate_with_refit_encoders()
+    expected = max(
+        abs(a - b) for a, b in zip(
+            overdue.predict_combined_risk_batch(VALIDATION_REQUESTS, build_features(VALIDATION_REQUESTS), candidate,
+                                                cache=NO_CACHE),
+            overdue.predict_combined_risk_batch(VALIDATION_REQUESTS, build_features(VALIDATION_REQUESTS),
+                                                overdue.get_models(), cache=NO_CACHE),
+        )
+    )
+    cached = OVERDUE_CACHE.stats()
+    checks = validate_candidate(candidate, duration.load_model())
+    assert checks["max_prob_drift"] == round(expected, 4)
+    assert OVERDUE_CACHE.stats() == cached
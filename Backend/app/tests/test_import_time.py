@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Cold `import app` must stay under this budget; models load in the background afterwards
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+
+# Libraries that must only be imported by the background warm-up, never by `import app` itself
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "xgboost", "catboost", "lightgbm", "onnxruntime")
+
+
+# Imports the app in a fresh interpreter under -X importtime and returns {module: cumulative microseconds}
+def import_times():
+    env = dict(os.environ, MODEL_WARMUP_ON_STARTUP="0", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+# Cold import of the app must fit the budget and leave the ML libraries unimported
+def test_import_time_budget():
+    times = import_times()
+    total_ms = times["app"] / 1000
+    slowest = sorted(((us, name) for name, us in times.items() if name.startswith("app.")), reverse=True)[:5]
+    print(f" import app: {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    for us, name in slowest:
+        print(f"   {name}: {us / 1000:.1f} ms")
+
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    assert not heavy, f"imported at startup: {heavy}"
+    assert total_ms < IMPORT_BUDGET_MS
+
+
+if __name__ == "__main__":
+    test_import_time_budget()
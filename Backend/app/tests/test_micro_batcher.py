@@ -0,0 +1,40 @@
+import threading
+import time
+
+from app.services.predictors import micro_batcher
+from app.services.predictors.micro_batcher import MicroBatcher
+
+
+# Batch scorer whose first call blocks until released, standing in for a stalled model call
+class StalledScorer:
+    def __init__(self):
+        self.calls = []
+        self.stalled = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, records):
+        self.calls.append(list(records))
+        if len(self.calls) == 1:
+            self.stalled.set()
+            self.release.wait(5)
+        return [record["id"] for record in records]
+
+
+# A caller that times out scores inline and withdraws its queued record, so no later batch scores it again
+def test_timed_out_record_is_scored_once(monkeypatch):
+    monkeypatch.setattr(micro_batcher, "MICRO_BATCH_TIMEOUT_SECONDS", 0.2)
+    scorer = StalledScorer()
+    batcher = MicroBatcher("test", scorer, max_wait_ms=0)
+
+    first = threading.Thread(target=batcher.submit, args=({"id": "a"},))
+    first.start()
+    assert scorer.stalled.wait(5)
+    assert batcher.submit({"id": "b"}) == "b"
+    scorer.release.set()
+    first.join(5)
+    time.sleep(0.1)
+
+    assert [call for call in scorer.calls if {"id": "b"} in call] == [[{"id": "b"}]]
+    assert batcher.stats()["queue_depth"] == 0
+    assert batcher.batches == 1
+    assert batcher.inline == 2
@@ -0,0 +1,117 @@
+import random
+import time
+import numpy as np
+import pytest
+import warnings
+
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+from app.services.predictors.features import build_features
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+from app.services.predictors import onnx_backend
+from app.services.predictors.onnx_backend import export_model, load_onnx_model
+
+PROBA_TOLERANCE = 1e-5
+HOURS_TOLERANCE = 1e-3
+# Batch sizes the latency comparison times, with how many calls each median is taken over
+BATCH_SIZES = (1, 32, 1024)
+LATENCY_REPEATS = {1: 200, 32: 50, 1024: 10}
+
+
+# Builds random requests covering every encoder class plus unseen labels
+def sample_requests(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    labels = {col: list(table._codes) + ["Unseen"] for col, table in overdue.get_models().encoder_tables.items()}
+    return [{
+        "MainCategory": rng.choice(labels["MainCategory"]),
+        "SubCategory": rng.choice(labels["SubCategory"]),
+        "Building": rng.choice(labels["Building"]),
+        "Site": rng.choice(labels["Site"]),
+        "Description": rng.choice(["urgent leak", "x" * rng.randint(1, 200), "קריטי"]),
+        "Created on": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+    } for _ in range(n)]
+
+
+# Exports every loaded model the way export_onnx.py does
+def export_all_models():
+    models = overdue.get_models()
+    for name, native in models.native.items():
+        export_model(name, native, len(models.features[name]), [models.model_paths[name]])
+    duration_model = duration.get_model()
+    export_model("lightgbm_duration", duration_model.native, len(duration_model.features), [duration_model.model_path])
+
+
+# Returns (name, native model, ONNX model, feature matrix builder) for every model with an export
+def model_pairs():
+    pairs = []
+    models = overdue.get_models()
+    for name, native in models.native.items():
+        onnx_model = load_onnx_model(name, [models.model_paths[name]])
+        if onnx_model is not None:
+            pairs.append((name, native, onnx_model, lambda records, f, name=name: overdue.preprocess_records(records, name, f)))
+    duration_model = duration.get_model()
+    onnx_model = load_onnx_model("lightgbm_duration", [duration_model.model_path])
+    if onnx_model is not None:
+        pairs.append(("lightgbm_duration", duration_model.native, onnx_model, duration.preprocess_records))
+    return pairs
+
+
+# Scores X the way the predictors do: class 1 probability for classifiers, raw prediction for regressors
+def scores(model, X) -> np.ndarray:
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X))[:, 1].astype(float)
+    return np.ravel(model.predict(X)).astype(float)
+
+
+# Times repeated calls and returns the median in milliseconds
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+# Exports the current models to a temporary ONNX_DIR, so parity is checked whether or not exports were committed
+@pytest.fixture(scope="module")
+def pairs(tmp_path_factory):
+    for module in ("onnxruntime", "onnxmltools", "skl2onnx"):
+        pytest.importorskip(module)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(onnx_backend, "ONNX_DIR", str(tmp_path_factory.mktemp("onnx")))
+        export_all_models()
+        exported = model_pairs()
+        assert len(exported) == len(overdue.get_models().native) + 1
+        yield exported
+
+
+# ONNX outputs must match the native models on every model input the predictors can produce
+def test_onnx_parity(pairs):
+    records = sample_requests(2000)
+    features = build_features(records)
+    for name, native, onnx_model, build in pairs:
+        X = build(records, features)
+        diff = float(np.max(np.abs(scores(native, X) - scores(onnx_model, X))))
+        tolerance = PROBA_TOLERANCE if hasattr(native, "predict_proba") else HOURS_TOLERANCE
+        assert diff <= tolerance, f"{name}: max abs diff {diff:.2e} (tolerance {tolerance:.0e})"
+
+
+# Times native vs ONNX predict for every model at each batch size and records the medians as test properties
+# (e.g. in the --junitxml report). Models served through ONNX by default must not be slower than their native
+# predict on a single ticket, the request path the onnx backend is for; larger batches are reported only, since
+# native XGBoost can win there.
+@pytest.mark.benchmark
+def test_onnx_latency(pairs, record_property):
+    for size in BATCH_SIZES:
+        records = sample_requests(size, seed=size)
+        features = build_features(records)
+        for name, native, onnx_model, build in pairs:
+            X = build(records, features)
+            native_ms = median_ms(lambda: scores(native, X), LATENCY_REPEATS[size])
+            onnx_ms = median_ms(lambda: scores(onnx_model, X), LATENCY_REPEATS[size])
+            record_property(f"{name}_batch_{size}_native_ms", round(native_ms, 3))
+            record_property(f"{name}_batch_{size}_onnx_ms", round(onnx_ms, 3))
+            if size == 1 and name in onnx_backend.ONNX_MODELS:
+                assert onnx_ms <= native_ms, f"{name}: native {native_ms:.3f} ms, onnx {onnx_ms:.3f} ms"
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from app.services.predictors.warmup import INFERENCE_STEPS, PENDING, ModelWarmup
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# How long the forked worker may take for its first prediction before it counts as hung
+FORK_PREDICT_TIMEOUT_SECONDS = 60
+
+# A fresh master preloads the models the way wsgi.py does under gunicorn's preload_app, then forks a worker that
+# scores a batch; the master exits with the worker's status
+PRELOAD_FORK_SCRIPT = textwrap.dedent(f"""
+    import os, signal, warnings
+    warnings.simplefilter("ignore")
+    from app.services.predictors.warmup import MODEL_WARMUP, WARMUP_REQUEST
+    MODEL_WARMUP.load_now()
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm({FORK_PREDICT_TIMEOUT_SECONDS})
+        from app.services.predictors.prediction_pipeline import predict_batch
+        os._exit(0 if len(predict_batch([WARMUP_REQUEST] * 256)) == 256 else 1)
+    _, status = os.waitpid(pid, 0)
+    raise SystemExit(os.WEXITSTATUS(status) if os.WIFEXITED(status) else 2)
+""")
+
+
+# The preload of a pre-forking master only deserializes the models, leaving the warm-up prediction to the workers
+def test_preload_skips_inference():
+    warmup = ModelWarmup()
+    warmup.load_now()
+    assert not warmup.errors
+    for name in INFERENCE_STEPS:
+        assert warmup.status[name] == PENDING
+
+
+# A worker forked after the preload scores with multi-threaded models instead of hanging on the master's thread pools
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_worker_predicts_after_preload_fork():
+    env = dict(os.environ, MODEL_THREADS="4", MODEL_WARMUP_ON_STARTUP="0", MODEL_WATCH_INTERVAL_SECONDS="0")
+    result = subprocess.run([sys.executable, "-c", PRELOAD_FORK_SCRIPT], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=FORK_PREDICT_TIMEOUT_SECONDS * 2)
+    assert result.returncode == 0, f"the forked worker hung or failed on its first prediction:\n{result.stderr}"
@@ -0,0 +1,60 @@
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.service_request_model import CREATED_ON_AS_DATE, LEGACY_DATETIME_FORMATS, parse_request_datetime
+
+# Afternoon, midnight and noon cover every branch of the 12-hour format
+SAMPLE_DATETIMES = [datetime(2024, 3, 5, 14, 30, 15), datetime(2024, 11, 28, 0, 5, 0), datetime(2023, 1, 9, 12, 0, 59)]
+INVALID_VALUES = ["", "   ", "not a date", "13/45/2024 10:00", "03/05/2024 13:30:00 PM", "03/05/2024 00:30:00 AM"]
+
+
+# The value a datetime keeps once written in a format (formats without seconds or time drop them)
+def truncated(value: datetime, fmt: str) -> datetime:
+    if "%S" not in fmt:
+        value = value.replace(second=0)
+    if "%M" not in fmt:
+        value = value.replace(hour=0, minute=0)
+    return value
+
+
+# Every stored value shape: each legacy format, ISO 8601 and a native date
+def sample_values():
+    values = [(d.strftime(fmt), truncated(d, fmt)) for fmt in LEGACY_DATETIME_FORMATS for d in SAMPLE_DATETIMES]
+    values += [(d.isoformat(), d) for d in SAMPLE_DATETIMES]
+    values += [(d, d) for d in SAMPLE_DATETIMES]
+    values += [(" 3/5/2024 9:05 ", datetime(2024, 3, 5, 9, 5)), ("03/05/2024 02:30:00 pm", datetime(2024, 3, 5, 14, 30))]
+    return values + [(value, None) for value in INVALID_VALUES]
+
+
+# parse_request_datetime reads every legacy format
+def test_parse_every_legacy_format():
+    for value, expected in sample_values():
+        assert parse_request_datetime(value) == expected, value
+
+
+# CREATED_ON_AS_DATE must agree with parse_request_datetime on every value shape; needs a MongoDB at MONGO_TEST_URI
+def test_date_expression_matches_python_parsing():
+    uri = os.getenv("MONGO_TEST_URI")
+    if not uri:
+        pytest.skip("MONGO_TEST_URI is not set")
+    from pymongo import MongoClient
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    collection = client["date_expression_test"][uuid.uuid4().hex]
+    try:
+        values = sample_values()
+        collection.insert_many([{"_id": i, "Created on": value} for i, (value, _) in enumerate(values)])
+        parsed = {doc["_id"]: doc["created"] for doc in collection.aggregate([{"$project": {"created": CREATED_ON_AS_DATE}}])}
+        for i, (value, _) in enumerate(values):
+            assert parsed[i] == parse_request_datetime(value), value
+    finally:
+        collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    test_parse_every_legacy_format()
+    test_date_expression_matches_python_parsing()
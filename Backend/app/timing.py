@@ -0,0 +1,134 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+
+load_dotenv()
+# "0" turns off the request hooks, Server-Timing headers and latency histograms
+REQUEST_TIMING_ENABLED = os.getenv("REQUEST_TIMING", "1") == "1"
+# Under gunicorn each worker writes its metrics here and /metrics merges them (see gunicorn.conf.py)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+SPAN_LATENCY = Histogram(
+    "request_span_duration_seconds", "Time spent in a named part of a request (Mongo commands, models, JSON)",
+    ["endpoint", "span"], buckets=LATENCY_BUCKETS,
+)
+
+
+# Labelled histogram children, cached so observing skips prometheus_client's label validation and lock
+_CHILDREN: Dict[tuple, Histogram] = {}
+
+
+# Returns the labelled child of a histogram
+def _child(histogram: Histogram, *labels: str) -> Histogram:
+    key = (histogram, labels)
+    child = _CHILDREN.get(key)
+    if child is None:
+        child = _CHILDREN[key] = histogram.labels(*labels)
+    return child
+
+
+# Per-request totals of named spans; a span entered several times in one request (e.g. Mongo getMore) is summed.
+# No lock: concurrent pool tasks record different span names, and a lost update would only drop one timing.
+class RequestSpans:
+    __slots__ = ("start", "totals")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.totals: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+
+# Spans of the request handled in this context; tasks submitted to INFERENCE_POOL run in a copy of it
+_CURRENT: ContextVar[Optional[RequestSpans]] = ContextVar("request_spans", default=None)
+
+
+# Adds an already measured duration to the current request's span; no-op outside a request
+def record_span(name: str, seconds: float):
+    spans = _CURRENT.get()
+    if spans is not None:
+        spans.add(name, seconds)
+
+
+# Times the enclosed block as a span of the current request; no-op outside a request.
+# A plain class rather than @contextmanager: it is entered several times per request, so it has to be cheap.
+class span:
+    __slots__ = ("name", "spans", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.spans = _CURRENT.get()
+        if self.spans is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.spans is not None:
+            self.spans.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# JSON provider whose serialization shows up as the "json" span
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs) -> str:
+        with span("json"):
+            return super().dumps(obj, **kwargs)
+
+
+def _before_request():
+    _CURRENT.set(RequestSpans())
+
+
+# Observes the request and its spans and adds them to the response as a Server-Timing header.
+# Flask runs after_request for error responses too, so this is also where the request's spans are detached.
+def _after_request(response):
+    spans = _CURRENT.get()
+    if spans is None:
+        return response
+    _CURRENT.set(None)
+    total = time.perf_counter() - spans.start
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+    _child(REQUEST_LATENCY, endpoint, request.method, str(response.status_code)).observe(total)
+    entries = []
+    for name, seconds in spans.totals.items():
+        _child(SPAN_LATENCY, endpoint, name).observe(seconds)
+        entries.append(f"{name};dur={seconds * 1000:.3f}")
+    entries.append(f"total;dur={total * 1000:.3f}")
+    response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
+# Installs the timing hooks and the timed JSON provider on an app
+def init_request_timing(app: Flask):
+    if not REQUEST_TIMING_ENABLED:
+        return
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+# Prometheus text exposition of this process's metrics, or of all workers in multiprocess mode
+def render_metrics():
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
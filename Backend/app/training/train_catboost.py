@@ -8,12 +8,11 @@ from sklearn.utils import shuffle
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from catboost import CatBoostClassifier
 from dotenv import load_dotenv
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.feature_selection import SelectKBest, f_classif
 
 load_dotenv()
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 MODEL_PATH = "app/ml_models/overdue/overdue_catboost_model.pkl"
 ENCODER_DIR = "app/ml_models/encoders"
 os.makedirs(ENCODER_DIR, exist_ok=True)
@@ -6,7 +6,8 @@ from datetime import datetime
 from sklearn.model_selection import train_test_split, RandomizedSearchCV, KFold
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import lightgbm as lgb  
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
+from app.services.predictors.thread_budget import TRAINING_N_JOBS
 from dotenv import load_dotenv
 from sklearn.utils import shuffle
 
@@ -17,7 +18,6 @@ warnings.simplefilter(action='ignore', category=UserWarning)
 warnings.simplefilter(action='ignore', category=pd.errors.SettingWithCopyWarning)
 
 load_dotenv()
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 MODEL_PATH = "app/ml_models/duration/lightgbm_duration_model.pkl"
 ENCODER_DIR = "app/ml_models/encoders_duration"
 os.makedirs(ENCODER_DIR, exist_ok=True)
@@ -109,7 +109,7 @@ def train_model():
 
     lgbm = lgb.LGBMRegressor(random_state=42)
 
-    random_search = RandomizedSearchCV(lgbm, param_dist, n_iter=10, cv=KFold(n_splits=5, shuffle=True, random_state=42),n_jobs=-1, verbose=2, random_state=42)
+    random_search = RandomizedSearchCV(lgbm, param_dist, n_iter=10, cv=KFold(n_splits=5, shuffle=True, random_state=42),n_jobs=TRAINING_N_JOBS, verbose=2, random_state=42)
 
     random_search.fit(X_train, y_train)
 
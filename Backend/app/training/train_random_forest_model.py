@@ -6,11 +6,11 @@ from sklearn.utils import shuffle
 from sklearn.preprocessing import LabelEncoder
 from dotenv import load_dotenv
 from datetime import datetime
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
+from app.services.predictors.thread_budget import TRAINING_N_JOBS
 from sklearn.model_selection import GridSearchCV  
 
 load_dotenv()
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 MODEL_PATH = "app/ml_models/overdue/overdue_random_forest_model.pkl"
 ENCODER_DIR = "app/ml_models/encoders"
 os.makedirs(ENCODER_DIR, exist_ok=True)
@@ -91,7 +91,7 @@ def train_model():
     grid_search = GridSearchCV(estimator=model,
                                param_grid=param_grid,
                                cv=5,
-                               n_jobs=-1,
+                               n_jobs=TRAINING_N_JOBS,
                                verbose=2)
 
     grid_search.fit(X, y)
@@ -6,7 +6,7 @@ from sklearn.utils import shuffle
 from sklearn.preprocessing import LabelEncoder
 from xgboost import XGBRegressor
 from sklearn.model_selection import train_test_split  
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
 from dotenv import load_dotenv
 import warnings
 
@@ -15,7 +15,6 @@ warnings.simplefilter(action='ignore', category=UserWarning)
 warnings.simplefilter(action='ignore', category=pd.errors.SettingWithCopyWarning)
 
 load_dotenv()
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 MODEL_PATH = "app/ml_models/overdue/xgboost_duration_model.pkl"
 ENCODER_DIR = "app/ml_models/encoders_duration"
 os.makedirs(ENCODER_DIR, exist_ok=True)
@@ -6,12 +6,12 @@ from sklearn.preprocessing import LabelEncoder
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.utils import shuffle
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
+from app.services.predictors.thread_budget import TRAINING_N_JOBS
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 MODEL_PATH = "app/ml_models/overdue/overdue_xgboost_model.pkl"
 ENCODER_DIR = "app/ml_models/encoders"
 os.makedirs(ENCODER_DIR, exist_ok=True)
@@ -102,7 +102,7 @@ def train_xgboost_model():
         param_grid=param_grid,
         scoring='accuracy',
         cv=5,
-        n_jobs=-1,
+        n_jobs=TRAINING_N_JOBS,
         verbose=2
     )
 
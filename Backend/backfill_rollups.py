@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the daily_rollups collection from service_requests and newRequests
+Run once before enabling DASHBOARD_USE_ROLLUPS=1, and again whenever rollups need to be rebuilt
+"""
+
+import sys
+
+from app.services.rollup_service import backfill_rollups
+
+
+def main():
+    print("🚀 Rebuilding daily rollups")
+    print("=" * 50)
+
+    try:
+        summary = backfill_rollups()
+    except Exception as e:
+        print(f"❌ Rebuild failed, the existing rollups were left in place: {e}")
+        return 1
+    if "error" in summary:
+        print(f"❌ {summary['error']}")
+        return 1
+
+    for source, result in summary.items():
+        print(f"✅ {source}: {result['buckets']} buckets written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
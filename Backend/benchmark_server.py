@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Script to compare request throughput of the Flask dev server (run.py) with the production servers (serve.py)
+Each server is started in turn on a free port, warmed up, then hit by concurrent clients posting tickets
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SERVERS = {
+    "dev": [sys.executable, "run.py"],
+    "gunicorn": [sys.executable, "serve.py"],
+    "waitress": [sys.executable, "serve.py"],
+}
+
+
+# A port nothing is listening on
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Ticket payloads with varied categories, hours and descriptions
+def _sample_bodies(count: int) -> list:
+    rng = random.Random(42)
+    bodies = []
+    for _ in range(count):
+        bodies.append(json.dumps({
+            "MainCategory": rng.choice(["A. Cleaning", "B. Maintenance", "C. Security"]),
+            "SubCategory": rng.choice(["Cleaning needed in Office", "Air conditioning", "Lighting", "Access card"]),
+            "Building": rng.choice(["A1", "B2", "C3"]),
+            "Site": rng.choice(["A", "B", "C"]),
+            "Description": "x" * rng.randint(0, 120),
+            "Created on": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024 {rng.randint(0, 23):02d}:30",
+        }).encode())
+    return bodies
+
+
+# Polls /healthz/ready until the server answers 200
+def _wait_ready(port: int, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/healthz/ready")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+# Runs the clients for the given time; returns (completed requests, errors, sorted latencies in ms)
+def _load(port: int, endpoint: str, clients: int, seconds: float) -> tuple:
+    bodies = _sample_bodies(512)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(offset: int):
+        local, failed, i = [], 0, offset
+        conn = None
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            # A kept-alive connection the server closed in the meantime (e.g. a recycled worker) is retried once
+            for attempt in range(2):
+                reused = conn is not None
+                try:
+                    if conn is None:
+                        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                    conn.request("POST", endpoint, bodies[i % len(bodies)], {"Content-Type": "application/json"})
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failed += 1
+                    if response.will_close:
+                        conn.close()
+                        conn = None
+                    break
+                except OSError:
+                    conn = None
+                    if not reused or attempt == 1:
+                        failed += 1
+                        break
+            local.append((time.perf_counter() - start) * 1000)
+            i += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    pool = [threading.Thread(target=client, args=(c * 31,)) for c in range(clients)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return len(latencies), errors[0], sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dev server and production server throughput")
+    parser.add_argument("--servers", default="dev,gunicorn,waitress", help="Comma-separated: dev, gunicorn, waitress")
+    parser.add_argument("--endpoint", default="/predict/predict", help="POST endpoint to load")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--seconds", type=float, default=15.0, help="Measurement time per server")
+    parser.add_argument("--startup-timeout", type=float, default=180.0, help="Seconds to wait for /healthz/ready")
+    args = parser.parse_args()
+
+    print(f"🚀 Server benchmark: {args.clients} clients on {args.endpoint}, {args.seconds:.0f}s per server")
+    print("=" * 72)
+    print(f"{'server':>10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for name in args.servers.split(","):
+        port = _free_port()
+        env = dict(os.environ, PORT=str(port), HOST="127.0.0.1")
+        if name != "dev":
+            env["WSGI_SERVER"] = name
+        proc = subprocess.Popen(SERVERS[name], cwd=BACKEND_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not _wait_ready(port, args.startup_timeout):
+                print(f"{name:>10} ❌ not ready after {args.startup_timeout:.0f}s")
+                continue
+            count, errors, latencies = _load(port, args.endpoint, args.clients, args.seconds)
+            p50 = latencies[len(latencies) // 2] if latencies else 0.0
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+            print(f"{name:>10} {count / args.seconds:>10.1f} {p50:>9.2f} {p99:>9.2f} {errors:>8}")
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    print("✅ Done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Script to measure single-ticket prediction throughput for different worker x thread splits of the server
+Each split runs WORKERS processes with THREADS threads scoring tickets, with the thread budget on and off
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import threading
+import time
+
+
+# Ticket payloads with varied subcategories (from the SLA table), hours and descriptions
+def _sample_requests(count: int, sub_categories: list) -> list:
+    rng = random.Random(42)
+    requests = []
+    for _ in range(count):
+        requests.append({
+            "MainCategory": rng.choice(["A. Cleaning", "B. Maintenance", "C. Security"]),
+            "SubCategory": rng.choice(sub_categories),
+            "Building": rng.choice(["A1", "B2", "C3"]),
+            "Site": rng.choice(["A", "B", "C"]),
+            "Description": "x" * rng.randint(0, 120),
+            "Created on": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024 {rng.randint(0, 23):02d}:30",
+        })
+    return requests
+
+
+# One server worker process: loads the models under the split's topology, then scores tickets on THREADS threads
+def _worker(workers: int, threads: int, budget: bool, seconds: float, barrier, results):
+    os.environ.update({
+        "WEB_CONCURRENCY": str(workers),
+        "WEB_THREADS": str(threads),
+        "MODEL_THREAD_BUDGET": "1" if budget else "0",
+        "PREDICTION_CACHE_SIZE": "0",
+        "PREDICT_MICRO_BATCH": "0",
+    })
+    from app.services.predictors.prediction_pipeline import predict_batch
+    from app.services.predictors.thread_budget import THREAD_BUDGET
+    from app.services.sla_service import SLA_SERVICE
+
+    requests = _sample_requests(256, sorted(SLA_SERVICE.index().exact))
+    predict_batch(requests[:1])
+    barrier.wait()
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(offset: int):
+        local = []
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            predict_batch([requests[i % len(requests)]])
+            local.append((time.perf_counter() - start) * 1000)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=run, args=(t * 17,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((THREAD_BUDGET.per_call if budget else None, latencies))
+
+
+# Runs one split and returns its throughput and latency percentiles
+def _run_split(workers: int, threads: int, budget: bool, seconds: float) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(workers, threads, budget, seconds, barrier, results))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    collected = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    latencies = sorted(ms for _, worker_latencies in collected for ms in worker_latencies)
+    if not latencies:
+        return {"per_call": collected[0][0], "rps": 0.0, "p50": 0.0, "p99": 0.0}
+    return {
+        "per_call": collected[0][0],
+        "rps": len(latencies) / seconds,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prediction throughput per worker x thread split")
+    parser.add_argument("--splits", default="1x1,1x4,2x2,4x1", help="Comma-separated WORKERSxTHREADS splits")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time per split")
+    args = parser.parse_args()
+
+    splits = []
+    for split in args.splits.split(","):
+        workers, threads = split.lower().split("x")
+        splits.append((int(workers), int(threads)))
+
+    from app.services.predictors.thread_budget import available_cpus
+
+    print(f"🚀 Thread budget benchmark on {available_cpus()} cores, {args.seconds:.0f}s per run")
+    print("=" * 72)
+    print(f"{'split':>8} {'budget':>8} {'threads/call':>13} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for workers, threads in splits:
+        for budget in (False, True):
+            result = _run_split(workers, threads, budget, args.seconds)
+            per_call = result["per_call"] if result["per_call"] is not None else "default"
+            print(f"{f'{workers}x{threads}':>8} {'on' if budget else 'off':>8} {per_call:>13} "
+                  f"{result['rps']:>10.1f} {result['p50']:>9.2f} {result['p99']:>9.2f}")
+    print("✅ Done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script to precompute the score cube of an overdue model whose features are all enumerable
+Run after retraining the model or refitting the encoders; a stale cube is ignored at startup
+"""
+
+import argparse
+import sys
+import time
+
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors.score_cube import build_cube, cube_shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute an overdue model's score cube")
+    parser.add_argument("--model", default="random_forest", help="Overdue model name, e.g. random_forest")
+    args = parser.parse_args()
+
+    print(f"🚀 Building score cube for {args.model}")
+    print("=" * 50)
+
+    models = overdue.get_models()
+    model = models.native.get(args.model)
+    if model is None:
+        print(f"❌ Model not loaded: {models.errors.get(args.model, 'unknown model')}")
+        return 1
+
+    columns = models.features[args.model]
+    shape = cube_shape(columns, models.encoder_tables)
+    if shape is None:
+        print(f"❌ {args.model} uses features that cannot be enumerated: {columns}")
+        return 1
+
+    cells = 1
+    for size in shape:
+        cells *= size
+    print(f"📊 Shape {shape}: {cells} combinations ({cells * 8 / 1e6:.1f} MB)")
+
+    started = time.perf_counter()
+    build_cube(
+        args.model,
+        lambda X: overdue._model_scores(model, X),
+        columns,
+        models.encoder_tables,
+        models.artifact_paths(args.model),
+    )
+    print(f"✅ Score cube written in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script to create the MongoDB indexes declared in app/indexes.py
+Safe to run repeatedly; pass --check to also verify that hot queries avoid COLLSCAN
+"""
+
+import sys
+
+from app.indexes import ensure_indexes, check_hot_queries
+
+
+def main(argv):
+    print("Ensuring MongoDB indexes...")
+    summary = ensure_indexes()
+    failed = False
+    for collection, result in summary.items():
+        if "error" in result:
+            failed = True
+            print(f"❌ {collection}: {result['error']}")
+        else:
+            print(f"✅ {collection}: {', '.join(result['indexes'])}")
+
+    if "--check" in argv:
+        print("\nExplaining hot queries...")
+        report = check_hot_queries()
+        for query in report["queries"]:
+            status = "✅" if query["ok"] else "❌"
+            detail = " > ".join(query.get("stages", [])) or query.get("error", "")
+            print(f"{status} {query['collection']} {query['filter']}: {detail}")
+        failed = failed or not report["ok"]
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
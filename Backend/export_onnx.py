@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script to export the overdue and duration models to ONNX for INFERENCE_BACKEND=onnx
+Run after retraining any model; an export older than its .pkl is ignored at startup
+"""
+
+import sys
+import warnings
+
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+from app.services.predictors.onnx_backend import export_model, onnx_paths
+
+
+def main():
+    print("🚀 Exporting models to ONNX")
+    print("=" * 50)
+
+    models = overdue.get_models()
+    exports = [
+        (name, model, len(models.features[name]), models.model_paths[name])
+        for name, model in models.native.items()
+    ]
+    duration_model = duration.get_model()
+    exports.append(("lightgbm_duration", duration_model.native, len(duration_model.features), duration_model.model_path))
+
+    for name, error in models.errors.items():
+        print(f"⚠️ Skipping {name}: {error}")
+
+    failed = False
+    for name, model, n_features, artifact_path in exports:
+        try:
+            meta = export_model(name, model, n_features, [artifact_path])
+            print(f"✅ {name} ({meta['estimator']}) -> {onnx_paths(name)[0]}")
+        except Exception as e:
+            failed = True
+            print(f"❌ {name}: {e}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
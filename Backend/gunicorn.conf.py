@@ -0,0 +1,66 @@
+import gc
+import os
+import shutil
+
+from dotenv import load_dotenv
+
+# Gunicorn settings for the backend: gunicorn -c gunicorn.conf.py wsgi:app
+load_dotenv()
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# Worker processes x request threads. Exported back to the environment so the model thread budget
+# (app/services/predictors/thread_budget.py) is derived from the same topology.
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("WEB_THREADS", "4"))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+os.environ["WEB_THREADS"] = str(threads)
+worker_class = "gthread"
+
+# Import the app, and load the models, in the master before forking
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# A worker that does not respond for this long (e.g. stuck in a request) is killed and replaced
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On SIGHUP/SIGTERM workers get this long to finish in-flight requests. SIGHUP replaces the workers gracefully;
+# with preload_app they are forked from the already loaded master, so code changes need a restart (or USR2),
+# while new model versions are swapped in by the model watcher without either.
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle each worker after this many requests (jittered so they do not all restart at once); 0 disables
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+# Runs in the master before the app is loaded
+def on_starting(server):
+    # With PROMETHEUS_MULTIPROC_DIR set, every worker writes its metrics there and /metrics merges them;
+    # files left by a previous run would be merged too
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+# Runs in the master once the app is loaded, before any worker is forked
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so collections in the workers do not write to
+    # (and un-share) the pages holding the models
+    gc.freeze()
+
+
+# Runs in each worker after it has loaded the app
+def post_worker_init(worker):
+    from app import start_background_tasks
+    start_background_tasks()
+
+
+# Runs in the master when a worker has exited
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Script to convert "Created on" / "Resolved date" / "Update date" strings to native BSON datetimes
+Resumable: progress is checkpointed per collection, pass --restart to start over
+"""
+
+import argparse
+import sys
+
+from app.services.date_migration import migrate_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--restart", action="store_true", help="ignore saved checkpoints")
+    args = parser.parse_args()
+
+    print("🚀 Migrating request dates to BSON datetimes")
+    print("=" * 50)
+
+    failed = False
+    for collection, stats in migrate_all(args.batch_size, args.restart).items():
+        if "error" in stats:
+            failed = True
+            print(f"❌ {collection}: {stats['error']}")
+            continue
+        print(f"✅ {collection}: scanned {stats['scanned']}, converted {stats['converted']}, "
+              f"unparseable {stats['unparseable']}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script to aggregate the sampling profiler's collapsed-stack files into a top-N hot-function report
+Self time counts samples where a function was running; total time counts samples where it was on the stack
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+from app.profiling import PROFILE_DIR, PROFILE_FILE_SUFFIX
+
+
+# Reads every profile in the directory whose file name contains the filter; returns (stack counts, files read)
+def load_profiles(directory: str, name_filter: str) -> tuple:
+    stacks = Counter()
+    files = 0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(PROFILE_FILE_SUFFIX) or name_filter not in name:
+            continue
+        files += 1
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+            for line in file:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the hottest functions in the collected profiles")
+    parser.add_argument("--dir", default=PROFILE_DIR, help="Profile directory")
+    parser.add_argument("--filter", default="", help="Only files whose name contains this, e.g. api_dashboard")
+    parser.add_argument("--top", type=int, default=20, help="Number of functions to list")
+    parser.add_argument("--folded-out", help="Also write the merged stacks here (input for flamegraph.pl / speedscope)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ No profile directory at {args.dir}")
+        return 1
+    stacks, files = load_profiles(args.dir, args.filter)
+    total = sum(stacks.values())
+    if not total:
+        print("❌ No samples found")
+        return 1
+
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for frame in set(frames):
+            total_counts[frame] += count
+
+    print(f"📊 {total} samples from {files} profiles in {args.dir}")
+    print("=" * 50)
+    for title, counts in (("Self", self_counts), ("Total", total_counts)):
+        print(f"\n{title} time, top {args.top}:")
+        for frame, count in counts.most_common(args.top):
+            print(f"  {100 * count / total:6.2f}%  {count:>7}  {frame}")
+
+    if args.folded_out:
+        with open(args.folded_out, "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        print(f"\n✅ Merged stacks written to {args.folded_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script to publish the trained models in app/ml_models as a new model registry version
+Run after the training scripts; --activate switches the served version without publishing
+"""
+
+import argparse
+import os
+import sys
+import warnings
+from datetime import datetime
+
+warnings.simplefilter(action='ignore', category=UserWarning)
+
+import joblib
+
+from app.services.predictors import overdue_risk_predictor as overdue
+from app.services.predictors import predict_response_time as duration
+from app.services.predictors.model_registry import (
+    REGISTRY_DIR, activate_version, current_version, list_versions, publish_version,
+)
+
+
+# Reads the classes of a fitted label encoder pickle
+def encoder_classes(path):
+    return list(getattr(joblib.load(path), "classes_", []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish or activate a model registry version")
+    parser.add_argument("--version", help="Version name (default: a timestamp)")
+    parser.add_argument("--no-activate", action="store_true", help="Publish without making it the current version")
+    parser.add_argument("--activate", metavar="VERSION", help="Make an already published version current")
+    parser.add_argument("--list", action="store_true", help="List published versions")
+    args = parser.parse_args()
+
+    if args.list:
+        current = current_version()
+        for version in list_versions():
+            print(f"{'*' if version == current else ' '} {version}")
+        return 0
+
+    if args.activate:
+        try:
+            activate_version(args.activate)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Current model version: {args.activate}")
+        return 0
+
+    version = args.version or datetime.now().strftime("%Y%m%d-%H%M%S")
+    print(f"🚀 Publishing model version {version} to {REGISTRY_DIR}")
+    print("=" * 50)
+
+    overdue_models = {}
+    for name, path in overdue.MODEL_PATHS.items():
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping {name}: {path} not found")
+            continue
+        estimator = overdue._unwrap_estimator(joblib.load(path))
+        overdue_models[name] = {
+            "estimator": estimator,
+            "features": overdue.FEATURE_COLUMNS[name],
+            "weight": overdue.MODEL_WEIGHTS[name],
+        }
+        print(f"📦 {name}: {type(estimator).__name__}")
+    if not overdue_models:
+        print("❌ No overdue models found")
+        return 1
+
+    duration_model = {
+        "estimator": duration._unwrap_estimator(joblib.load(duration.MODEL_PATH)),
+        "features": duration.FEATURE_COLUMNS,
+    }
+    print(f"📦 lightgbm_duration: {type(duration_model['estimator']).__name__}")
+
+    try:
+        manifest = publish_version(
+            version,
+            overdue_models,
+            {col: encoder_classes(path) for col, path in overdue.ENCODER_PATHS.items()},
+            duration_model,
+            {col: encoder_classes(path) for col, path in duration.ENCODER_PATHS.items()},
+            activate=not args.no_activate,
+        )
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        return 1
+
+    files = {entry["file"] for section in ("overdue", "duration") for kind in ("models", "encoders")
+             for entry in manifest[section][kind].values()}
+    print(f"✅ Published {version} ({len(files)} files){'' if args.no_activate else ', now current'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
-from app import app
+import os
 
+from app import create_app
+
+app = create_app()
 
-if __name__ == "__main__":
-    app.run(debug=True, use_reloader=False)
 
-    
\ No newline at end of file
+# Flask's development server; use serve.py in production
+if __name__ == "__main__":
+    app.run(debug=True, use_reloader=False, port=int(os.getenv("PORT", "5000")))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Production server entry point
+Runs gunicorn with gunicorn.conf.py where it is available, otherwise waitress (e.g. on Windows)
+"""
+
+import importlib.util
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Whether gunicorn can run here; it needs fork, so never on Windows
+def _gunicorn_available() -> bool:
+    return os.name != "nt" and importlib.util.find_spec("gunicorn") is not None
+
+
+def main():
+    server = os.getenv("WSGI_SERVER") or ("gunicorn" if _gunicorn_available() else "waitress")
+    os.chdir(BACKEND_DIR)
+
+    if server == "gunicorn":
+        print("🚀 Starting gunicorn with gunicorn.conf.py")
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"])
+
+    try:
+        from waitress import serve
+    except ImportError:
+        print("❌ Neither gunicorn nor waitress is installed")
+        return 1
+
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "5000"))
+    threads = int(os.getenv("WEB_THREADS", "8"))
+    # Set before the app is imported so the model thread budget sees a single process with these threads
+    os.environ["WEB_CONCURRENCY"] = "1"
+    os.environ["WEB_THREADS"] = str(threads)
+
+    from app import start_background_tasks
+    from wsgi import app
+    start_background_tasks()
+
+    print(f"🚀 Starting waitress on {host}:{port} with {threads} threads")
+    # waitress is a single process: no worker recycling, and channel_timeout closes idle connections only
+    serve(app, host=host, port=port, threads=threads,
+          channel_timeout=int(os.getenv("WAITRESS_CHANNEL_TIMEOUT", "60")),
+          connection_limit=int(os.getenv("WAITRESS_CONNECTION_LIMIT", "200")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,7 @@ import os
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.db import get_collection
+from app.db import DATABASE_NAME, get_collection
 
 def update_schema():
     """Update the database schema for all users"""
@@ -18,7 +18,7 @@ def update_schema():
     
     try:
         # Get the users collection
-        collection = get_collection("DS_PROJECT", "users")
+        collection = get_collection(DATABASE_NAME, "users")
         if collection is None:
             print("❌ Failed to connect to users collection")
             return False
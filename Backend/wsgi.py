@@ -0,0 +1,8 @@
+import os
+
+from app import create_app
+
+# WSGI entry point for production servers (gunicorn -c gunicorn.conf.py wsgi:app, or serve.py).
+# With gunicorn's preload_app the master imports this module, so the models load once and the forked workers
+# share those pages copy-on-write; background threads are started per worker by the server config.
+app = create_app(preload_models=os.getenv("PRELOAD_MODELS", "1") == "1", start_background=False)
@@ -5,6 +5,14 @@ import {
   DashboardOpenRequests,
 } from '../types/dashboard.type'
 
+// Warns when the backend cut a dashboard load down to recent requests to stay within its memory budget
+const warnIfDegraded = (url: string, headers: Record<string, any>) => {
+  const degraded = headers['x-dashboard-degraded']
+  if (degraded) {
+    console.warn(`${url} only covers requests created ${degraded.replace('since=', 'since ')}`)
+  }
+}
+
 // Service class for handling dashboard-related API calls and data fetching
 export class DashboardService {
   // Fetches comprehensive dashboard data organized by sites, years and months
@@ -22,6 +30,7 @@ export class DashboardService {
   getTimeData = async (): Promise<TimeDataList> => {
     try {
       const response = await get('/api/dashboard-data')
+      warnIfDegraded('/api/dashboard-data', response.headers)
       return response.data
     } catch (error) {
       console.error('Error fetching time data:', error)
@@ -44,6 +53,7 @@ export class DashboardService {
   getOpenRequestsDashboardData = async (): Promise<DashboardOpenRequests> => {
     try {
       const response = await get('/api/dashboard-open-requests')
+      warnIfDegraded('/api/dashboard-open-requests', response.headers)
       console.log('test', response.data)
       return response.data
     } catch (error) {